@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+
+def name_counts(codes, counts, order, names):
+    """value_counts() of the names behind category codes: most courses first, ties in order of first row"""
+    valid = codes >= 0
+    codes, counts, order = codes[valid], counts[valid], order[valid]
+    totals = np.bincount(codes, weights=counts, minlength=len(names)).astype(np.int64)
+    firsts = np.full(len(names), np.iinfo(np.int64).max)
+    np.minimum.at(firsts, codes, order)
+    present = np.flatnonzero(totals)
+    ranking = np.lexsort((firsts[present], -totals[present]))
+    return pd.Series(totals[present[ranking]], index=pd.Index(names[present[ranking]], dtype=object))
+
+
+def group_means(codes, sums, counts, groups):
+    """Course count and mean fee per category code, for the codes present"""
+    valid = codes >= 0
+    totals = np.bincount(codes[valid], weights=counts[valid], minlength=groups)
+    sums = np.bincount(codes[valid], weights=sums[valid], minlength=groups)
+    present = np.flatnonzero(totals)
+    return present, totals[present].astype(np.int64), sums[present] / totals[present]
+
+
+def fee_quantile(sorted_fees, cumulative, q):
+    """Linearly interpolated quantile of the fees each repeated by its count, as np.quantile computes it"""
+    position = q * (cumulative[-1] - 1)
+    below = int(np.floor(position))
+    index = np.searchsorted(cumulative, [below, below + 1], side='right').clip(max=len(sorted_fees) - 1)
+    low, high = sorted_fees[index]
+    return low + (high - low) * (position - below)
+
+
+def summarize_groups(fees, sums, type_codes, uni_codes, counts, order, types, universities):
+    """Every number of the KPI cards, charts and statistics panel, from groups of courses sharing a program
+    type, university and fee: single rows of a scan, or cells of the aggregate cube. sums is the fee total of
+    each group, order the position of its first row in the filtered table, which breaks ties in the rankings"""
+    known = ~np.isnan(fees)
+    tuition_fees, tuition_sums, tuition_counts = fees[known], sums[known], counts[known]
+    with_tuition = int(tuition_counts.sum())
+    total_courses = int(counts.sum())
+    summary = {
+        'tuition_fees': np.repeat(tuition_fees, tuition_counts),
+        'total_courses': total_courses,
+        'total_universities': len(np.unique(uni_codes[uni_codes >= 0])),
+        'with_tuition': with_tuition,
+        'without_tuition': total_courses - with_tuition,
+        'avg_tuition': tuition_sums.sum() / with_tuition if with_tuition > 0 else 0,
+        'max_tuition': tuition_fees.max() if with_tuition > 0 else 0,
+        'tuition_avg': None,
+        'uni_avg': None,
+        # Whole rankings of the universities by programs, and by programs without a fee
+        'courses_per_uni': name_counts(uni_codes, counts, order, universities)
+                           .rename_axis('ชื่อมหาวิทยาลัย').reset_index(name='จำนวนหลักสูตร'),
+        'no_tuition_unis': name_counts(uni_codes[~known], counts[~known], order[~known], universities)
+    }
+    
+    if with_tuition > 0:
+        present, _, means = group_means(type_codes[known], tuition_sums, tuition_counts, len(types))
+        summary['tuition_avg'] = pd.DataFrame({'ประเภทหลักสูตร': types[present], 'ค่าเทอมต่อเทอม_ประมาณ': means})
+        
+        present, totals, means = group_means(uni_codes[known], tuition_sums, tuition_counts, len(universities))
+        uni_avg = pd.DataFrame({'ชื่อมหาวิทยาลัย': universities[present], 'mean': means, 'count': totals})
+        uni_avg = uni_avg[uni_avg['count'] >= 2]  # At least 2 courses
+        # Highest mean first, ties in category order as nlargest() keeps them
+        summary['uni_avg'] = uni_avg.sort_values('mean', ascending=False, kind='stable')
+        
+        ranking = np.argsort(tuition_fees, kind='stable')
+        sorted_fees, cumulative = tuition_fees[ranking], np.cumsum(tuition_counts[ranking])
+        squares = (tuition_counts * (tuition_fees - summary['avg_tuition']) ** 2).sum()
+        summary['median_tuition'] = fee_quantile(sorted_fees, cumulative, 0.5)
+        summary['std_tuition'] = np.sqrt(squares / (with_tuition - 1)) if with_tuition > 1 else np.nan
+        summary['min_tuition'] = tuition_fees.min()
+        summary['q1_tuition'] = fee_quantile(sorted_fees, cumulative, 0.25)
+        summary['q3_tuition'] = fee_quantile(sorted_fees, cumulative, 0.75)
+    return summary
+
+
+def aggregate(dataset, rows):
+    """Summary of the selected rows in one sweep, every row a group of one course"""
+    fees = dataset.tuition_index.fees[rows]
+    return summarize_groups(fees, fees, dataset.type_index.codes[rows], dataset.uni_index.codes[rows],
+                            np.ones(len(rows), dtype=np.int64), np.arange(len(rows)),
+                            dataset.type_index.categories, dataset.uni_index.categories)
+
+
+class AggregateCube:
+    """Course count and fee sum per (program type, university, fee bucket) cell, built once per dataset.
+    The buckets are the distinct fees: any slider range covers whole buckets, and a bucket's min, max and
+    histogram are its fee. Filters without a search only select cells, the rows are never read"""
+    def __init__(self, type_index, uni_index, tuition_index):
+        self.type_index = type_index
+        self.uni_index = uni_index
+        self.rows = len(tuition_index.fees)
+        # Missing fees share one bucket, sorted last
+        fee_values, fee_codes = np.unique(tuition_index.fees, return_inverse=True)
+        cells = ((type_index.codes.astype(np.int64) + 1) * (len(uni_index.categories) + 1)
+                 + uni_index.codes + 1) * len(fee_values) + fee_codes
+        _, first, counts = np.unique(cells, return_index=True, return_counts=True)
+        self.type_codes = type_index.codes[first]
+        self.uni_codes = uni_index.codes[first]
+        self.fees = tuition_index.fees[first]
+        self.counts = counts
+        self.sums = self.fees * counts
+        # Position of each cell's first row, the rankings break ties in table order
+        self.first = first
+    
+    def select(self, selected_type, selected_uni, data_filter, tuition_range):
+        """Bitmap of the cells holding the rows filter_rows() selects"""
+        known = ~np.isnan(self.fees)
+        mask = np.ones(len(self.counts), dtype=bool)
+        if selected_type:
+            mask &= np.isin(self.type_codes, self.type_index.selected_codes(selected_type))
+        if selected_uni:
+            mask &= np.isin(self.uni_codes, self.uni_index.selected_codes(selected_uni))
+        if data_filter == 'with_tuition':
+            mask &= known
+        elif data_filter == 'without_tuition':
+            mask &= ~known
+        if tuition_range:
+            # Courses without a fee are kept, as in the table
+            mask &= ~known | ((self.fees >= tuition_range[0]) & (self.fees <= tuition_range[1]))
+        return mask
+    
+    def rollup(self, selected_type, selected_uni, data_filter, tuition_range):
+        """Summary of the filtered courses, added up from the matching cells"""
+        mask = self.select(selected_type, selected_uni, data_filter, tuition_range)
+        order = self.first[mask]
+        if tuition_range:
+            # The table lists the rows in the range first, then the rows without a fee
+            order = np.where(np.isnan(self.fees[mask]), order + self.rows, order)
+        return summarize_groups(self.fees[mask], self.sums[mask], self.type_codes[mask], self.uni_codes[mask],
+                                self.counts[mask], order, self.type_index.categories, self.uni_index.categories)
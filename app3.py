@@ -1,18 +1,50 @@
+import time
+START_TIME = time.perf_counter()
+
+import json
 import pandas as pd
-from dash import Dash, dcc, html, Input, Output, dash_table
+from dash import Dash, ClientsideFunction, ctx, dcc, html, Input, Output, State, dash_table
+from dash.exceptions import PreventUpdate
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import dash_bootstrap_components as dbc
 import numpy as np
+from data_store import DatasetWatcher
+from dashboard_cache import FigureCache, FilterCache, ResultCache, filter_key
+from aggregates import aggregate
+from table_query import page_count, page_records, query_rows, table_columns
 
-# Load data
-df = pd.read_excel('final_data.xlsx')
+# Load data from the Parquet snapshot, rebuilt from final_data.xlsx when the workbook is newer.
+# The watcher reloads it in the background when either file changes, use watcher.current for the latest version
+watcher = DatasetWatcher()
 
 # Initialize Dash app with Bootstrap
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
 
+# Start the watcher in the process serving the request: workers forked after import (gunicorn --preload)
+# do not inherit its thread
+@server.before_request
+def start_watcher():
+    watcher.start()
+
+# Filtered rows and their statistics per filter combination and dataset version, in this worker
+filter_cache = FilterCache(max_entries=256, ttl=600)
+# The same on disk, shared by all workers of the server: the callbacks of one filter change run on several
+result_cache = ResultCache(".filter_cache", max_bytes=256 * 1024 * 1024)
+# Chart JSON per filter key on disk, shared by all workers of the server
+figure_cache = FigureCache(".figure_cache", max_bytes=64 * 1024 * 1024)
+
+
+@server.route('/cache-stats')
+def cache_stats():
+    """Hit/miss counters of the filter, result and figure caches of this worker"""
+    return {'filter_cache': filter_cache.summary(), 'result_cache': result_cache.summary(),
+            'figure_cache': figure_cache.summary()}
+
+
 # Green Theme Color Palette
 colors = {
     'primary': '#2E8B57',      # Sea Green
@@ -27,6 +59,30 @@ colors = {
     'chart_green': ['#2E8B57', '#228B22', '#32CD32', '#20B2AA', '#90EE90', '#8FBC8F', '#98FB98']
 }
 
+
+def ranking_controls(prefix, top_n, highest, lowest):
+    """Number of universities and order of a ranking chart, applied in the browser"""
+    return html.Div([
+        dbc.RadioItems(
+            id=f'{prefix}-top-n',
+            options=[{'label': str(n), 'value': n} for n in (5, 10, 15, 20)],
+            value=top_n,
+            inline=True,
+            className="custom-radio d-inline-block me-3"
+        ),
+        dbc.RadioItems(
+            id=f'{prefix}-order',
+            options=[{'label': highest, 'value': 'desc'}, {'label': lowest, 'value': 'asc'}],
+            value='desc',
+            inline=True,
+            className="custom-radio d-inline-block"
+        )
+    ], className="mt-2")
+
+
+# Styled ranking charts without data, filled in once the chart builders below are defined
+chart_shells = dcc.Store(id='chart-shells')
+
 # Enhanced Layout with Green Theme
 app.layout = dbc.Container([
     # Animated Header Section
@@ -177,8 +233,9 @@ app.layout = dbc.Container([
                 dbc.Col([
                     html.Label("ประเภทหลักสูตร", className="fw-bold mb-2", style={'color': colors['dark']}),
                     dcc.Dropdown(
-                        options=[{'label': i, 'value': i} for i in sorted(df['ประเภทหลักสูตร'].unique())],
+                        options=watcher.current.type_options,
                         id='type-filter',
+                        multi=True,
                         placeholder="เลือกประเภทหลักสูตร",
                         style={'border-radius': '10px'},
                         className="custom-dropdown",
@@ -190,8 +247,9 @@ app.layout = dbc.Container([
                 dbc.Col([
                     html.Label("ชื่อมหาวิทยาลัย", className="fw-bold mb-2", style={'color': colors['dark']}),
                     dcc.Dropdown(
-                        options=[{'label': i, 'value': i} for i in sorted(df['ชื่อมหาวิทยาลัย'].unique())],
+                        options=watcher.current.uni_options,
                         id='uni-filter',
+                        multi=True,
                         placeholder="เลือกมหาวิทยาลัย",
                         style={'border-radius': '10px'},
                         className="custom-dropdown",
@@ -224,6 +282,8 @@ app.layout = dbc.Container([
                         max=100000,
                         step=5000,
                         value=[0, 100000],
+                        # Range lookups are two binary searches, cheap enough to follow the handle live
+                        updatemode='drag',
                         marks={i: f'{i//1000}k' for i in range(0, 101000, 20000)},
                         tooltip={"placement": "bottom", "always_visible": True}
                     )
@@ -318,9 +378,10 @@ app.layout = dbc.Container([
                 dbc.CardHeader([
                     html.Div([
                         html.I(className="fas fa-chart-line me-2", style={'color': colors['primary']}),
-                        html.H5("🏆 ค่าเทอมเฉลี่ยตามมหาวิทยาลัย (Top 10)", className="mb-0 d-inline", 
+                        html.H5("🏆 ค่าเทอมเฉลี่ยตามมหาวิทยาลัย", className="mb-0 d-inline", 
                                style={'color': colors['primary']})
-                    ])
+                    ]),
+                    ranking_controls('uni', 10, "สูงสุด", "ต่ำสุด")
                 ], style={'background': colors['light'], 'border': 'none'}),
                 dbc.CardBody([
                     dcc.Graph(id='university-comparison-chart')
@@ -338,7 +399,8 @@ app.layout = dbc.Container([
                         html.I(className="fas fa-graduation-cap me-2", style={'color': colors['primary']}),
                         html.H5("🎓 จำนวนหลักสูตรตามมหาวิทยาลัย", className="mb-0 d-inline", 
                                style={'color': colors['primary']})
-                    ])
+                    ]),
+                    ranking_controls('courses', 15, "มากที่สุด", "น้อยที่สุด")
                 ], style={'background': colors['light'], 'border': 'none'}),
                 dbc.CardBody([
                     dcc.Graph(id='courses-per-university-chart')
@@ -381,9 +443,11 @@ app.layout = dbc.Container([
                     {"name": i, "id": i, 
                      'presentation': 'markdown' if i == 'URL' else 'input',
                      'type': 'text'}
-                    for i in ['ชื่อมหาวิทยาลัย'] + [col for col in df.columns if col != 'ชื่อมหาวิทยาลัย']
+                    for i in table_columns(watcher.current.df)
                 ],
-                data=df.to_dict('records'),
+                # Filled one page at a time by update_table
+                data=[],
+                page_current=0,
                 page_size=20,
                 style_table={'overflowX': 'auto'},
                 style_cell={
@@ -416,9 +480,13 @@ app.layout = dbc.Container([
                         'backgroundColor': 'white'
                     }
                 ],
-                filter_action="native",
-                sort_action="native",
-                page_action="native",
+                # Paging, sorting and the filter row run on the server, the browser only gets the page shown
+                filter_action="custom",
+                filter_query="",
+                sort_action="custom",
+                sort_mode="single",
+                sort_by=[],
+                page_action="custom",
                 style_as_list_view=True
             )
         ], style={'background': 'white'})
@@ -436,7 +504,16 @@ app.layout = dbc.Container([
         dbc.CardBody([
             html.Div(id='universities-without-tuition')
         ], style={'background': colors['light']})
-    ], className="shadow-lg", style={'border-radius': '15px', 'border': 'none'})
+    ], className="shadow-lg", style={'border-radius': '15px', 'border': 'none'}),
+
+    # Dataset version shown on the page, checked against the server's every 30 seconds
+    dcc.Store(id='data-version', data=watcher.current.version),
+    # Filters of the current selection, the key every output callback looks its data up by
+    dcc.Store(id='filter-selection'),
+    # Numbers of the KPI cards and the university rankings of the current selection, formatted in the browser
+    dcc.Store(id='summary-payload'),
+    chart_shells,
+    dcc.Interval(id='data-refresh', interval=30 * 1000)
 
 ], fluid=True, style={
     'padding': '2rem', 
@@ -445,72 +522,82 @@ app.layout = dbc.Container([
 })
 
 
-# Enhanced Callbacks with Additional Charts
+# Pick up a reloaded dataset: new dropdown options, and a new version that refreshes the dashboard
 @app.callback(
-    [Output('total-courses', 'children'),
-     Output('total-universities', 'children'),
-     Output('with-tuition', 'children'),
-     Output('without-tuition', 'children'),
-     Output('avg-tuition', 'children'),
-     Output('most-expensive', 'children'),
-     Output('course-table', 'data'),
-     Output('tuition-chart', 'figure'),
-     Output('tuition-status-chart', 'figure'),
-     Output('tuition-distribution-chart', 'figure'),
-     Output('university-comparison-chart', 'figure'),
-     Output('courses-per-university-chart', 'figure'),
-     Output('tuition-statistics', 'children'),
-     Output('universities-without-tuition', 'children')],
-    [Input('type-filter', 'value'),
-     Input('uni-filter', 'value'),
-     Input('search-input', 'value'),
-     Input('data-filter', 'value'),
-     Input('tuition-range', 'value')]
+    [Output('type-filter', 'options'),
+     Output('uni-filter', 'options'),
+     Output('data-version', 'data')],
+    Input('data-refresh', 'n_intervals'),
+    State('data-version', 'data')
 )
-def update_dashboard(selected_type, selected_uni, keyword, data_filter, tuition_range):
-    filtered = df.copy()
+def refresh_dataset(n_intervals, shown_version):
+    dataset = watcher.current
+    if dataset.version == shown_version:
+        raise PreventUpdate
+    return dataset.type_options, dataset.uni_options, dataset.version
+
 
-    # Apply filters
+def filter_rows(dataset, selected_type, selected_uni, keyword, data_filter, tuition_range):
+    """Positions of the rows matching the dashboard filters, in the order the table shows them"""
+    df = dataset.df
+
+    # Apply filters: AND of the row bitmaps from the indexes, rows are only copied once at the end.
+    # Each dropdown may hold several values, a row matches any of them
+    mask = np.ones(len(df), dtype=bool)
     if selected_type:
-        filtered = filtered[filtered['ประเภทหลักสูตร'] == selected_type]
+        mask &= dataset.type_index.mask(selected_type)
     if selected_uni:
-        filtered = filtered[filtered['ชื่อมหาวิทยาลัย'] == selected_uni]
+        mask &= dataset.uni_index.mask(selected_uni)
     if keyword:
-        filtered = filtered[filtered.apply(lambda row: keyword.lower() in str(row).lower(), axis=1)]
-    
-    # Apply tuition range filter
-    if tuition_range:
-        tuition_filtered = filtered[filtered['ค่าเทอมต่อเทอม_ประมาณ'].notna()]
-        tuition_filtered = tuition_filtered[
-            (tuition_filtered['ค่าเทอมต่อเทอม_ประมาณ'] >= tuition_range[0]) &
-            (tuition_filtered['ค่าเทอมต่อเทอม_ประมาณ'] <= tuition_range[1])
-        ]
-        no_tuition = filtered[filtered['ค่าเทอมต่อเทอม_ประมาณ'].isna()]
-        filtered = pd.concat([tuition_filtered, no_tuition])
+        # Rows containing every word of the search, looked up in the n-gram index
+        mask &= dataset.text_index.mask(keyword)
 
     # Apply data filter based on tuition info
+    tuition_index = dataset.tuition_index
     if data_filter == 'with_tuition':
-        filtered = filtered[filtered['ค่าเทอมต่อเทอม_ประมาณ'].notna()]
+        mask &= tuition_index.known
     elif data_filter == 'without_tuition':
-        filtered = filtered[filtered['ค่าเทอมต่อเทอม_ประมาณ'].isna()]
-
-    # Statistics
-    total_courses = len(filtered)
-    total_universities = filtered['ชื่อมหาวิทยาลัย'].nunique()
-    with_tuition = len(filtered[filtered['ค่าเทอมต่อเทอม_ประมาณ'].notna()])
-    without_tuition = len(filtered[filtered['ค่าเทอมต่อเทอม_ประมาณ'].isna()])
+        mask &= tuition_index.unknown
     
-    # Additional statistics
-    tuition_data = filtered[filtered['ค่าเทอมต่อเทอม_ประมาณ'].notna()]
-    avg_tuition = tuition_data['ค่าเทอมต่อเทอม_ประมาณ'].mean() if len(tuition_data) > 0 else 0
-    max_tuition = tuition_data['ค่าเทอมต่อเทอม_ประมาณ'].max() if len(tuition_data) > 0 else 0
+    # Apply tuition range filter: rows with a fee in the range, then the rows without a fee
+    if tuition_range:
+        in_range = mask & tuition_index.range_mask(tuition_range[0], tuition_range[1])
+        rows = np.concatenate([np.flatnonzero(in_range), np.flatnonzero(mask & tuition_index.unknown)])
+    else:
+        rows = np.flatnonzero(mask)
+    return rows
+
+
+def selected_rows(dataset, filters):
+    """Row positions of the filters, computed once per filter key and shared by the callbacks of every worker"""
+    key = filter_key(dataset.version, *filters)
+    return filter_cache.get_or_compute(
+        ('rows', key), lambda: result_cache.get_or_build(key, 'rows', lambda: filter_rows(dataset, *filters)))
+
+
+def summarize(dataset, filters):
+    """Every number the cards and charts are built from"""
+    selected_type, selected_uni, keyword, data_filter, tuition_range = filters
+    if keyword:
+        # The search matches single rows, sweep them
+        return aggregate(dataset, selected_rows(dataset, filters))
+    # The other filters select whole cells of the cube, add them up without reading the rows
+    return dataset.cube.rollup(selected_type, selected_uni, data_filter, tuition_range)
+
+
+def shared_summary(dataset, filters):
+    """Statistics of the filters, computed once per filter key and shared by the callbacks of every worker"""
+    key = filter_key(dataset.version, *filters)
+    return filter_cache.get_or_compute(
+        key, lambda: result_cache.get_or_build(key, 'summary', lambda: summarize(dataset, filters)))
 
+
+def tuition_chart_figure(summary):
+    """Bar chart of the mean fee per program type"""
     # 1. Enhanced Tuition chart with Green Theme
-    if len(tuition_data) > 0:
-        tuition_avg = tuition_data.groupby("ประเภทหลักสูตร")["ค่าเทอมต่อเทอม_ประมาณ"].mean().reset_index()
-        
+    if summary['with_tuition'] > 0:
         tuition_chart = px.bar(
-            tuition_avg,
+            summary['tuition_avg'],
             x="ประเภทหลักสูตร",
             y="ค่าเทอมต่อเทอม_ประมาณ",
             labels={"ค่าเทอมต่อเทอม_ประมาณ": "ค่าเทอมเฉลี่ย (บาท)"},
@@ -550,7 +637,13 @@ def update_dashboard(selected_type, selected_uni, keyword, data_filter, tuition_
             plot_bgcolor=colors['light'],
             paper_bgcolor=colors['light']
         )
+    return tuition_chart
+
 
+def tuition_status_figure(summary):
+    """Pie chart of programs with and without a known fee"""
+    with_tuition = summary['with_tuition']
+    without_tuition = summary['without_tuition']
     # 2. Enhanced Tuition status chart with Green Theme
     status_data = pd.DataFrame({
         'สถานะ': ['✅ มีข้อมูลค่าเทอม', '❓ ไม่ระบุค่าเทอม'],
@@ -579,11 +672,16 @@ def update_dashboard(selected_type, selected_uni, keyword, data_filter, tuition_
         textfont_size=14,
         marker=dict(line=dict(color=colors['primary'], width=2))
     )
+    return tuition_status_chart
 
+
+def tuition_distribution_figure(summary):
+    """Histogram of the fees with the mean marked"""
+    avg_tuition = summary['avg_tuition']
     # 3. NEW: Tuition Distribution Chart (Histogram + KDE-like)
-    if len(tuition_data) > 0:
+    if summary['with_tuition'] > 0:
         tuition_distribution_chart = px.histogram(
-            tuition_data,
+            pd.DataFrame({"ค่าเทอมต่อเทอม_ประมาณ": summary['tuition_fees']}),
             x="ค่าเทอมต่อเทอม_ประมาณ",
             nbins=20,
             title="🌊 การกระจายตัวของค่าเทอม",
@@ -629,15 +727,15 @@ def update_dashboard(selected_type, selected_uni, keyword, data_filter, tuition_
             plot_bgcolor=colors['light'],
             paper_bgcolor=colors['light']
         )
+    return tuition_distribution_chart
+
 
+def university_comparison_figure(summary):
+    """Bar chart of universities by mean fee, the browser fills in the top N"""
     # 4. NEW: University Comparison Chart (Top 10)
-    if len(tuition_data) > 0:
-        uni_avg = tuition_data.groupby("ชื่อมหาวิทยาลัย")["ค่าเทอมต่อเทอม_ประมาณ"].agg(['mean', 'count']).reset_index()
-        uni_avg = uni_avg[uni_avg['count'] >= 2]  # At least 2 courses
-        uni_avg = uni_avg.nlargest(10, 'mean')
-        
+    if summary['with_tuition'] > 0:
         university_comparison_chart = px.bar(
-            uni_avg,
+            summary['uni_avg'],
             x="mean",
             y="ชื่อมหาวิทยาลัย",
             orientation='h',
@@ -678,13 +776,14 @@ def update_dashboard(selected_type, selected_uni, keyword, data_filter, tuition_
             plot_bgcolor=colors['light'],
             paper_bgcolor=colors['light']
         )
+    return university_comparison_chart
 
+
+def courses_per_university_figure(summary):
+    """Bar chart of universities by number of programs, the browser fills in the top N"""
     # 5. NEW: Courses per University Chart
-    courses_per_uni = filtered['ชื่อมหาวิทยาลัย'].value_counts().head(15).reset_index()
-    courses_per_uni.columns = ['ชื่อมหาวิทยาลัย', 'จำนวนหลักสูตร']
-    
     courses_per_university_chart = px.bar(
-        courses_per_uni,
+        summary['courses_per_uni'],
         x="จำนวนหลักสูตร",
         y="ชื่อมหาวิทยาลัย",
         orientation='h',
@@ -712,14 +811,172 @@ def update_dashboard(selected_type, selected_uni, keyword, data_filter, tuition_
         marker_line_color=colors['primary'],
         marker_line_width=1
     )
+    return courses_per_university_chart
+
 
+# Chart builders by output id
+CHARTS = {
+    'tuition-chart': tuition_chart_figure,
+    'tuition-status-chart': tuition_status_figure,
+    'tuition-distribution-chart': tuition_distribution_figure
+}
+
+# Ranking charts drawn in the browser by output id: chart builder, ranking of the payload and title per order
+RANKINGS = {
+    'university-comparison-chart': (university_comparison_figure, 'uni_avg', {
+        'desc': "🏆 ค่าเทอมเฉลี่ยสูงสุด {n} อันดับ",
+        'asc': "🏆 ค่าเทอมเฉลี่ยต่ำสุด {n} อันดับ"
+    }),
+    'courses-per-university-chart': (courses_per_university_figure, 'courses_per_uni', {
+        'desc': "🎓 มหาวิทยาลัยที่มีหลักสูตรมากที่สุด (Top {n})",
+        'asc': "🎓 มหาวิทยาลัยที่มีหลักสูตรน้อยที่สุด (Top {n})"
+    })
+}
+
+
+def ranking_chart_shells():
+    """The styled ranking charts without data, sent to the browser once with the layout"""
+    no_universities = {
+        'with_tuition': 1,
+        'uni_avg': pd.DataFrame({'ชื่อมหาวิทยาลัย': pd.Series([], dtype=object), 'mean': pd.Series([], dtype=float)}),
+        'courses_per_uni': pd.DataFrame({'ชื่อมหาวิทยาลัย': pd.Series([], dtype=object),
+                                         'จำนวนหลักสูตร': pd.Series([], dtype=int)})
+    }
+    shells = {}
+    for chart_id, (build, field, titles) in RANKINGS.items():
+        shells[chart_id] = {
+            'field': field,
+            'titles': titles,
+            'chart': json.loads(pio.to_json(build(no_universities))),
+            # The payload has no fee ranking when no program of the filters has a fee
+            'empty': json.loads(pio.to_json(build({'with_tuition': 0}))) if field == 'uni_avg' else None
+        }
+    return shells
+
+
+chart_shells.data = ranking_chart_shells()
+
+
+# Enhanced Callbacks with Additional Charts
+# The filters are applied once per change into filter-selection, which only holds the filters: the row positions
+# and statistics stay in the server's caches under the filter key. Every output then has its own callback, the
+# browser requests them in parallel, workers compute them concurrently and each output appears when it is ready
+@app.callback(
+    Output('filter-selection', 'data'),
+    [Input('type-filter', 'value'),
+     Input('uni-filter', 'value'),
+     Input('search-input', 'value'),
+     Input('data-filter', 'value'),
+     Input('tuition-range', 'value'),
+     Input('data-version', 'data')]
+)
+def select_courses(selected_type, selected_uni, keyword, data_filter, tuition_range, data_version=None):
+    dataset = watcher.current
+    filters = [selected_type, selected_uni, keyword, data_filter, tuition_range]
+    # Fill the caches the output callbacks of this worker read
+    selected_rows(dataset, filters)
+    shared_summary(dataset, filters)
+    return {'version': dataset.version, 'filters': filters}
+
+
+def selection_dataset(selection):
+    """Dataset and filters of the filter-selection store. Nothing to update before the first selection, nor for a
+    selection made on another version of the data: select_courses() runs again once the new version is shown"""
+    if not selection:
+        raise PreventUpdate
+    dataset = watcher.current
+    if dataset.version != selection['version']:
+        # The selection may come from a worker that reloaded first
+        watcher.check()
+        dataset = watcher.current
+        if dataset.version != selection['version']:
+            raise PreventUpdate
+    return dataset, selection['filters']
+
+
+@app.callback(
+    Output('summary-payload', 'data'),
+    Input('filter-selection', 'data')
+)
+def update_summary_payload(selection):
+    """The few numbers the browser derives the KPI cards and top-N charts from, instead of their markup"""
+    summary = shared_summary(*selection_dataset(selection))
+    uni_avg = summary['uni_avg']
+    courses_per_uni = summary['courses_per_uni']
+    return {
+        'total_courses': summary['total_courses'],
+        'total_universities': summary['total_universities'],
+        'with_tuition': summary['with_tuition'],
+        'without_tuition': summary['without_tuition'],
+        'avg_tuition': summary['avg_tuition'],
+        'max_tuition': summary['max_tuition'],
+        # Whole rankings, highest first, so the browser can show any top N in either order
+        'uni_avg': None if uni_avg is None else {
+            'names': uni_avg['ชื่อมหาวิทยาลัย'].tolist(),
+            'values': uni_avg['mean'].tolist()
+        },
+        'courses_per_uni': {
+            'names': courses_per_uni['ชื่อมหาวิทยาลัย'].tolist(),
+            'values': courses_per_uni['จำนวนหลักสูตร'].tolist()
+        }
+    }
+
+
+# KPI cards and ranking charts are formatted by assets/dashboard.js, without a request per change
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='cards'),
+    [Output('total-courses', 'children'),
+     Output('total-universities', 'children'),
+     Output('with-tuition', 'children'),
+     Output('without-tuition', 'children'),
+     Output('avg-tuition', 'children'),
+     Output('most-expensive', 'children')],
+    Input('summary-payload', 'data')
+)
+
+for chart_id, prefix in (('university-comparison-chart', 'uni'), ('courses-per-university-chart', 'courses')):
+    app.clientside_callback(
+        ClientsideFunction(namespace='dashboard', function_name='ranking'),
+        Output(chart_id, 'figure'),
+        [Input('summary-payload', 'data'),
+         Input(f'{prefix}-top-n', 'value'),
+         Input(f'{prefix}-order', 'value')],
+        State('chart-shells', 'data'),
+        State(chart_id, 'id')
+    )
+
+
+def chart_callback(chart_id, build):
+    """Callback of one chart. Figures are shared by every worker through the figure cache,
+    the statistics are only looked up when the figure is not there"""
+    def update_chart(selection):
+        # The dataset this call works on to the end, even if a reload swaps in a new one meanwhile
+        dataset, filters = selection_dataset(selection)
+        key = filter_key(dataset.version, *filters)
+        return figure_cache.get_or_build(key, chart_id, lambda: build(shared_summary(dataset, filters)))
+    return update_chart
+
+
+for chart_id, build in CHARTS.items():
+    app.callback(Output(chart_id, 'figure'), Input('filter-selection', 'data'))(chart_callback(chart_id, build))
+
+
+@app.callback(
+    Output('tuition-statistics', 'children'),
+    Input('filter-selection', 'data')
+)
+def update_tuition_statistics(selection):
+    summary = shared_summary(*selection_dataset(selection))
+    avg_tuition = summary['avg_tuition']
+    max_tuition = summary['max_tuition']
+    
     # 7. Enhanced Tuition statistics with Green Theme
-    if len(tuition_data) > 0:
-        median_tuition = tuition_data['ค่าเทอมต่อเทอม_ประมาณ'].median()
-        std_tuition = tuition_data['ค่าเทอมต่อเทอม_ประมาณ'].std()
-        min_tuition = tuition_data['ค่าเทอมต่อเทอม_ประมาณ'].min()
-        q1_tuition = tuition_data['ค่าเทอมต่อเทอม_ประมาณ'].quantile(0.25)
-        q3_tuition = tuition_data['ค่าเทอมต่อเทอม_ประมาณ'].quantile(0.75)
+    if summary['with_tuition'] > 0:
+        median_tuition = summary['median_tuition']
+        std_tuition = summary['std_tuition']
+        min_tuition = summary['min_tuition']
+        q1_tuition = summary['q1_tuition']
+        q3_tuition = summary['q3_tuition']
         
         tuition_statistics = html.Div([
             dbc.Row([
@@ -790,9 +1047,18 @@ def update_dashboard(selected_type, selected_uni, keyword, data_filter, tuition_
                 "ไม่มีข้อมูลค่าเทอมในตัวกรองที่เลือก"
             ], color="warning", className="text-center")
         ])
+    return tuition_statistics
+
 
+@app.callback(
+    Output('universities-without-tuition', 'children'),
+    Input('filter-selection', 'data')
+)
+def update_universities_without_tuition(selection):
+    summary = shared_summary(*selection_dataset(selection))
+    
     # 8. Universities without tuition info - Enhanced Green Theme
-    no_tuition_unis = filtered[filtered['ค่าเทอมต่อเทอม_ประมาณ'].isna()]['ชื่อมหาวิทยาลัย'].value_counts()
+    no_tuition_unis = summary['no_tuition_unis']
     if len(no_tuition_unis) > 0:
         unis_cards = []
         for i, (uni, count) in enumerate(no_tuition_unis.head(12).items()):
@@ -849,31 +1115,35 @@ def update_dashboard(selected_type, selected_uni, keyword, data_filter, tuition_
             html.I(className="fas fa-check-circle me-2"),
             "🎉 ไม่มีมหาวิทยาลัยที่ไม่ระบุค่าเทอมในตัวกรองที่เลือก"
         ], color="success", className="text-center")
+    return unis_without_tuition
 
-    # Format table data to show NaN values nicely
-    table_data = filtered.copy()
-    table_data['ค่าเทอมต่อเทอม_ประมาณ'] = table_data['ค่าเทอมต่อเทอม_ประมาณ'].fillna('❌ ไม่ระบุ')
-    
-    # Reorder columns to put university name first
-    columns_ordered = ['ชื่อมหาวิทยาลัย'] + [col for col in table_data.columns if col != 'ชื่อมหาวิทยาลัย']
-    table_data = table_data[columns_ordered]
+
+@app.callback(
+    [Output('course-table', 'data'),
+     Output('course-table', 'page_count'),
+     Output('course-table', 'page_current')],
+    [Input('filter-selection', 'data'),
+     Input('course-table', 'page_current'),
+     Input('course-table', 'page_size'),
+     Input('course-table', 'sort_by'),
+     Input('course-table', 'filter_query')]
+)
+def update_table(selection, page_current, page_size, sort_by, filter_query):
+    """One page of the course table, the payload stays page_size rows however many courses match"""
+    dataset, filters = selection_dataset(selection)
+    key = filter_key(dataset.version, *filters)
+    sort_key = tuple((column['column_id'], column['direction']) for column in sort_by or [])
+    # Matching rows of the dashboard filters and the table's own filter row, sorted, as positions
+    rows = filter_cache.get_or_compute(
+        ('table', key, filter_query or "", sort_key),
+        lambda: query_rows(dataset.df, selected_rows(dataset, filters), filter_query, sort_by))
     
-    return (
-        f"{total_courses:,}",
-        f"{total_universities:,}",
-        f"{with_tuition:,}",
-        f"{without_tuition:,}",
-        f"฿{avg_tuition:,.0f}" if avg_tuition > 0 else "ไม่มีข้อมูล",
-        f"฿{max_tuition:,.0f}" if max_tuition > 0 else "ไม่มีข้อมูล",
-        table_data.to_dict('records'),
-        tuition_chart,
-        tuition_status_chart,
-        tuition_distribution_chart,
-        university_comparison_chart,
-        courses_per_university_chart,
-        tuition_statistics,
-        unis_without_tuition
-    )
+    pages = page_count(rows, page_size)
+    # Any change other than turning the page starts again from the first page
+    if 'course-table.page_current' not in ctx.triggered_prop_ids:
+        page_current = 0
+    page_current = min(page_current or 0, pages - 1)
+    return page_records(dataset.df, rows, page_current, page_size), pages, page_current
 
 
 # Add custom CSS for enhanced styling
@@ -966,5 +1236,7 @@ app.index_string = '''
 </html>
 '''
 
+print(f"Dashboard ready in {time.perf_counter() - START_TIME:.2f}s")
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
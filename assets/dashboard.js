@@ -0,0 +1,51 @@
+// Clientside callbacks of app3.py: the server sends the aggregate payload once per filter change,
+// the KPI card texts and the top-N variants of the ranking charts are derived here without a request
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        // KPI cards, formatted like Python's f"{n:,}" and f"฿{n:,.0f}"
+        cards: function (payload) {
+            if (!payload) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var count = function (n) {
+                return n.toLocaleString('en-US');
+            };
+            var baht = function (n) {
+                return n > 0 ? '฿' + n.toLocaleString('en-US', {maximumFractionDigits: 0}) : 'ไม่มีข้อมูล';
+            };
+            return [
+                count(payload.total_courses),
+                count(payload.total_universities),
+                count(payload.with_tuition),
+                count(payload.without_tuition),
+                baht(payload.avg_tuition),
+                baht(payload.max_tuition)
+            ];
+        },
+
+        // Top N of a ranking, highest or lowest first, drawn into a copy of the styled chart
+        ranking: function (payload, topN, order, shells, chartId) {
+            if (!payload || !shells) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var shell = shells[chartId];
+            var ranking = payload[shell.field];
+            if (!ranking) {
+                return shell.empty;
+            }
+            var names = ranking.names.slice();
+            var values = ranking.values.slice();
+            if (order === 'asc') {
+                names.reverse();
+                values.reverse();
+            }
+            var figure = JSON.parse(JSON.stringify(shell.chart));
+            var trace = figure.data[0];
+            trace.y = names.slice(0, topN);
+            trace.x = values.slice(0, topN);
+            trace.marker.color = trace.x;
+            figure.layout.title.text = shell.titles[order].replace('{n}', topN);
+            return figure;
+        }
+    }
+});
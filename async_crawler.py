@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from information import TCASEngineeringScraper, ENGINEERING_WORDS
+
+# Marks the end of a stage's input
+DONE = object()
+
+
+class JsonlSink:
+    """Write each row to a JSON Lines file as soon as it is extracted"""
+    def __init__(self, filename="tcas_programs_stream.jsonl"):
+        self.filename = filename
+        # Rows stream into a fresh file that replaces the previous run's when this one finishes,
+        # a rerun never appends the same URLs twice
+        self.tmp_file = f"{filename}.tmp"
+        self.file = open(self.tmp_file, 'w', encoding='utf-8')
+    
+    def write(self, processing_info, program_data):
+        self.file.write(json.dumps({'processing': processing_info, 'main': program_data}, ensure_ascii=False) + '\n')
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+        os.replace(self.tmp_file, self.filename)
+    
+    def abort(self):
+        # The rows written so far stay in the tmp file, the previous run's file is left as it was
+        self.file.close()
+        print(f"Run did not finish, partial rows kept in {self.tmp_file}")
+
+
+class ScraperSink:
+    """Collect rows on the scraper so save_to_excel can still write the usual workbook"""
+    def __init__(self, scraper):
+        self.scraper = scraper
+    
+    def write(self, processing_info, program_data):
+        self.scraper.add_result(processing_info, program_data)
+    
+    def close(self):
+        # Rows arrive in completion order, restore the ลำดับ order for the workbook
+        self.scraper.processing_data.sort(key=lambda row: row['ลำดับ'])
+    
+    def abort(self):
+        self.close()
+
+
+class AsyncTCASCrawler:
+    """Streaming crawl pipeline: keyword search -> URL dedup -> page fetch -> extraction -> writers"""
+    def __init__(self, scraper, sinks, search_concurrency=1, fetch_concurrency=4,
+                 extract_concurrency=2, queue_size=16, title_words=ENGINEERING_WORDS):
+        self.scraper = scraper
+        self.sinks = sinks
+        self.search_concurrency = search_concurrency
+        self.fetch_concurrency = fetch_concurrency
+        self.extract_concurrency = extract_concurrency
+        self.queue_size = queue_size
+        self.title_words = title_words
+        self.stats = {'searched': 0, 'found': 0, 'duplicates': 0, 'fetched': 0, 'written': 0}
+    
+    async def run(self, keywords):
+        """Crawl every keyword and stream the extracted rows to the sinks"""
+        loop = asyncio.get_running_loop()
+        # Blocking Selenium/HTTP calls run on threads, one per concurrent search or fetch
+        executor = ThreadPoolExecutor(max_workers=self.search_concurrency + self.fetch_concurrency
+                                      + self.extract_concurrency)
+        loop.set_default_executor(executor)
+        
+        # Bounded queues between stages: a slow stage makes the ones before it wait instead of piling up work
+        keyword_queue = asyncio.Queue()
+        result_queue = asyncio.Queue(self.queue_size)
+        fetch_queue = asyncio.Queue(self.queue_size)
+        page_queue = asyncio.Queue(self.queue_size)
+        row_queue = asyncio.Queue(self.queue_size)
+        
+        for keyword in keywords:
+            keyword_queue.put_nowait(keyword)
+        for _ in range(self.search_concurrency):
+            keyword_queue.put_nowait(DONE)
+        
+        searchers = [asyncio.create_task(self.search_stage(keyword_queue, result_queue))
+                     for _ in range(self.search_concurrency)]
+        dedup = asyncio.create_task(self.dedup_stage(result_queue, fetch_queue))
+        fetchers = [asyncio.create_task(self.fetch_stage(fetch_queue, page_queue))
+                    for _ in range(self.fetch_concurrency)]
+        extractors = [asyncio.create_task(self.extract_stage(page_queue, row_queue))
+                      for _ in range(self.extract_concurrency)]
+        writer = asyncio.create_task(self.write_stage(row_queue))
+        
+        try:
+            # Shut stages down in order, each one gets a DONE per consumer once its producers finished
+            await asyncio.gather(*searchers)
+            await result_queue.put(DONE)
+            await dedup
+            for _ in range(self.fetch_concurrency):
+                await fetch_queue.put(DONE)
+            await asyncio.gather(*fetchers)
+            for _ in range(self.extract_concurrency):
+                await page_queue.put(DONE)
+            await asyncio.gather(*extractors)
+            await row_queue.put(DONE)
+            await writer
+        except BaseException:
+            # Failed or interrupted: the sinks must not publish a partial result
+            for sink in self.sinks:
+                sink.abort()
+            raise
+        finally:
+            for task in searchers + fetchers + extractors + [dedup, writer]:
+                task.cancel()
+            executor.shutdown(wait=False)
+        for sink in self.sinks:
+            sink.close()
+        
+        print(f"\n=== Async crawl completed ===")
+        print(f"Keywords searched: {self.stats['searched']}, links found: {self.stats['found']}, "
+              f"duplicates skipped: {self.stats['duplicates']}")
+        print(f"Pages fetched: {self.stats['fetched']}, rows written: {self.stats['written']}")
+        if self.scraper.page_cache:
+            self.scraper.page_cache.save()
+            self.scraper.page_cache.print_stats()
+        return self.stats
+    
+    async def search_stage(self, keyword_queue, result_queue):
+        """Run keyword searches, each on a browser borrowed from the scraper's pool"""
+        while True:
+            keyword = await keyword_queue.get()
+            if keyword is DONE:
+                return
+            results = await asyncio.to_thread(self.search, keyword)
+            self.stats['searched'] += 1
+            self.stats['found'] += len(results)
+            for result in results:
+                await result_queue.put(result)
+    
+    def search(self, keyword):
+        driver = self.scraper.driver_pool.acquire()
+        try:
+            return self.scraper.search_keyword(keyword, driver, title_words=self.title_words)
+        finally:
+            self.scraper.driver_pool.release(driver)
+    
+    async def dedup_stage(self, result_queue, fetch_queue):
+        """Drop URLs already queued and number the rest in arrival order"""
+        seen_urls = set()
+        while True:
+            result = await result_queue.get()
+            if result is DONE:
+                return
+            if result['url'] in seen_urls:
+                self.stats['duplicates'] += 1
+                continue
+            seen_urls.add(result['url'])
+            await fetch_queue.put((len(seen_urls), result))
+    
+    async def fetch_stage(self, fetch_queue, page_queue):
+        """Fetch course pages as detached snapshots so extraction can overlap with the next fetch"""
+        while True:
+            item = await fetch_queue.get()
+            if item is DONE:
+                return
+            i, result = item
+            try:
+                page = await asyncio.to_thread(self.scraper.fetch_snapshot, result['url'])
+            except Exception as e:
+                print(f"Error loading course page: {e}")
+                page = None
+            self.stats['fetched'] += 1
+            await page_queue.put((i, result, page))
+    
+    async def extract_stage(self, page_queue, row_queue):
+        """Parse fetched pages into Processing_Data/Main_Data rows"""
+        while True:
+            item = await page_queue.get()
+            if item is DONE:
+                return
+            rows = await asyncio.to_thread(self.extract, *item)
+            await row_queue.put(rows)
+    
+    def extract(self, i, result, page):
+        if page is None:
+            processing_info, course_details = self.scraper.empty_processing_info(result['url']), None
+        else:
+            processing_info, course_details = self.scraper.extract_page(page)
+        return self.scraper.build_rows(i, result, processing_info, course_details)
+    
+    async def write_stage(self, row_queue):
+        """Hand every row to the sinks the moment it is ready"""
+        while True:
+            rows = await row_queue.get()
+            if rows is DONE:
+                return
+            for sink in self.sinks:
+                sink.write(*rows)
+            self.stats['written'] += 1
+
+
+def read_keywords(args):
+    """Keywords from the command line and/or a file with one keyword per line"""
+    keywords = list(args.keywords)
+    if args.keywords_file:
+        with open(args.keywords_file, encoding='utf-8') as f:
+            keywords.extend(line.strip() for line in f if line.strip())
+    return keywords or ["วิศวกรรมคอมพิวเตอร์", "วิศวกรรมปัญญาประดิษฐ์"]
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Streaming asyncio crawl of course.mytcas.com")
+    parser.add_argument("keywords", nargs="*", help="search keywords (default: the two engineering keywords)")
+    parser.add_argument("--keywords-file", help="file with one search keyword per line, e.g. every TCAS faculty")
+    parser.add_argument("--all-programs", action="store_true",
+                        help="keep every search result instead of engineering programs only")
+    parser.add_argument("--search-concurrency", type=int, default=1)
+    parser.add_argument("--fetch-concurrency", type=int, default=4)
+    parser.add_argument("--extract-concurrency", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=16, help="capacity of the queue between two stages")
+    parser.add_argument("--rate-limit", type=float, default=1.0,
+                        help="maximum page loads per second across all workers (0 = unlimited)")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--cache-dir", default=".page_cache", help="directory of the on-disk page cache")
+    parser.add_argument("--no-cache", action="store_true", help="always download every course page")
+    parser.add_argument("--cache-ttl", type=float, default=6,
+                        help="hours a cached page is used without asking the server whether it changed")
+    parser.add_argument("--output", default="tcas_programs_stream.jsonl", help="JSON Lines file rows stream into")
+    parser.add_argument("--excel", help="also write the usual two-sheet workbook when the crawl finishes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the streaming crawler"""
+    args = parse_args(argv)
+    scraper = TCASEngineeringScraper(workers=max(args.search_concurrency, args.fetch_concurrency),
+                                     rate_limit=args.rate_limit, backend=args.backend,
+                                     cache_dir=None if args.no_cache else args.cache_dir,
+                                     cache_ttl=args.cache_ttl * 3600)
+    if not scraper.driver:
+        print("Failed to initialize driver. Please check ChromeDriver installation.")
+        return
+    
+    sinks = [JsonlSink(args.output)]
+    if args.excel:
+        sinks.append(ScraperSink(scraper))
+    
+    crawler = AsyncTCASCrawler(
+        scraper, sinks,
+        search_concurrency=args.search_concurrency,
+        fetch_concurrency=args.fetch_concurrency,
+        extract_concurrency=args.extract_concurrency,
+        queue_size=args.queue_size,
+        title_words=None if args.all_programs else ENGINEERING_WORDS
+    )
+    
+    try:
+        asyncio.run(crawler.run(read_keywords(args)))
+        if args.excel:
+            scraper.save_to_excel(args.excel)
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        scraper.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import re
+import time
+import numpy as np
+import pandas as pd
+from tuition import normalize_tuition
+
+# ค่าใช้จ่าย texts the way the scraper writes them, {} is filled with a random amount
+TEMPLATES = [
+    'ภาคการศึกษาต้นและภาคการศึกษาปลาย ภาคการศึกษาละ {} บาท ภาคฤดูร้อน(ถ้ามี) ภาคการศึกษาละ 6,375 บาท',
+    '{} บาท ต่อภาคการศึกษา | {} บาท ต่อภาค',
+    '{} บาท/เทอม | ค่าธรรมเนียมการศึกษา (ชาวไทย) {} บาท/เทอม',
+    'อัตราค่าเล่าเรียน {}.-/ภาคการศึกษา',
+    '{} บาท ตลอดหลักสูตร',
+    '{}',
+    'ค่าธรรมเนียมแรกเข้า {} บาท',
+    None
+]
+
+
+def extract_tuition(text):
+    """The notebook's row-wise version, kept here as the baseline"""
+    if pd.isna(text):
+        return None, None
+    text = str(text)
+    
+    match1 = re.search(r'ภาคการศึกษาละ\s*([\d,]+)', text)
+    if match1:
+        return int(match1.group(1).replace(',', '')), 'per_term'
+    
+    match2 = re.search(r'([,\d]+)[^\d]{0,5}(?:บาท)?\s*(?:/|ต่อ)?\s*ภาค', text)
+    if match2:
+        return int(match2.group(1).replace(',', '')), 'per_term'
+    
+    match3 = re.search(r'([\d,]+)', text)
+    if match3:
+        value = int(match3.group(1).replace(',', ''))
+        if value >= 100000:
+            return value, 'lumpsum'
+    
+    return None, None
+
+
+def rowwise(df):
+    """cclean.ipynb before: apply building a Series per row, then an axis=1 apply"""
+    df = df.copy()
+    df[['ค่าใช้จ่าย_ตัวเลข', 'ประเภทค่าใช้จ่าย']] = df['ค่าใช้จ่าย'].apply(
+        lambda x: pd.Series(extract_tuition(x))
+    )
+    df['ค่าเทอมต่อเทอม_ประมาณ'] = df.apply(
+        lambda row: row['ค่าใช้จ่าย_ตัวเลข'] / 8 if row['ประเภทค่าใช้จ่าย'] == 'lumpsum'
+        else row['ค่าใช้จ่าย_ตัวเลข'], axis=1
+    )
+    return df
+
+
+def synthetic_costs(rows, amounts=600, seed=0):
+    """Random ค่าใช้จ่าย column built from the templates"""
+    rng = np.random.default_rng(seed)
+    templates = rng.integers(len(TEMPLATES), size=rows)
+    amounts = rng.integers(5, 5 + amounts, size=rows) * 1000
+    texts = [None if TEMPLATES[t] is None else TEMPLATES[t].format(*[f"{a:,}"] * TEMPLATES[t].count('{}'))
+             for t, a in zip(templates, amounts)]
+    return pd.DataFrame({'ค่าใช้จ่าย': texts})
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark the tuition normalization against the notebook's apply")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 300000],
+                        help="synthetic row counts to run")
+    parser.add_argument("--amounts", type=int, default=600,
+                        help="distinct amounts per template, raise it for fewer repeated texts")
+    parser.add_argument("--baseline-limit", type=int, default=100000,
+                        help="largest row count the slow row-wise version is run on")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"{'rows':>10}{'distinct':>10}{'row-wise s':>14}{'vectorized s':>14}{'speedup':>10}{'rows/s':>14}")
+    for rows in args.rows:
+        df = synthetic_costs(rows, args.amounts)
+        columns, vectorized = timed(normalize_tuition, df['ค่าใช้จ่าย'])
+        
+        baseline = speedup = ''
+        if rows <= args.baseline_limit:
+            expected, seconds = timed(rowwise, df)
+            for column in columns:
+                # Compare values only, the row-wise version's dtypes depend on the pandas version
+                pd.testing.assert_series_equal(columns[column].astype(object), expected[column].astype(object),
+                                               check_dtype=False)
+            baseline, speedup = f"{seconds:.2f}", f"{seconds / vectorized:.1f}x"
+        distinct = df['ค่าใช้จ่าย'].nunique()
+        print(f"{rows:>10,}{distinct:>10,}{baseline:>14}{vectorized:>14.2f}{speedup:>10}{rows / vectorized:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import copy
+import json
+import os
+import threading
+import pandas as pd
+
+
+def state_filename(excel_file):
+    """State store kept next to the output workbook"""
+    return os.path.splitext(excel_file)[0] + ".state.json"
+
+
+def cost_parts(processing_row):
+    """ค่าใช้จ่าย snippets as a set, so a different join order does not count as a change"""
+    cost = (processing_row or {}).get('ค่าใช้จ่าย')
+    if not isinstance(cost, str) or cost == "N/A":
+        return frozenset()
+    return frozenset(part.strip() for part in cost.split(' | '))
+
+
+class CrawlState:
+    """Per-URL store of page content hash, extraction results and output rows from one run"""
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, filename, excel_file=None):
+        """Load a saved state, or rebuild the rows from the previous workbook when there is none"""
+        if os.path.exists(filename):
+            with open(filename, encoding='utf-8') as f:
+                return cls(json.load(f))
+        if excel_file and os.path.exists(excel_file):
+            return cls.from_excel(excel_file)
+        return cls()
+    
+    @classmethod
+    def from_excel(cls, excel_file):
+        """Rows of a previous workbook, without hashes, so every page is extracted again once"""
+        sheets = pd.read_excel(excel_file, sheet_name=None)
+        entries = {}
+        for sheet_name, key in (('Processing_Data', 'processing'), ('Main_Data', 'main')):
+            if sheet_name not in sheets:
+                continue
+            sheet = sheets[sheet_name].astype(object)
+            for row in sheet.where(sheet.notna(), None).to_dict('records'):
+                entries.setdefault(row['URL'], {'hash': None, 'extracted': None})[key] = row
+        print(f"Loaded previous run from {excel_file}: {len(entries)} programs")
+        return cls(entries)
+    
+    def unchanged_extraction(self, url, content_hash):
+        """Extraction results from the previous run if the page content is the same"""
+        entry = self.entries.get(url)
+        if not entry or not content_hash or entry.get('hash') != content_hash or not entry.get('extracted'):
+            return None
+        return copy.deepcopy(entry['extracted'])
+    
+    def record(self, url, content_hash, processing_info, course_details):
+        """Remember what a page looked like and what was extracted from it"""
+        with self.lock:
+            self.entries[url] = {
+                'hash': content_hash,
+                'extracted': copy.deepcopy([processing_info, course_details])
+            }
+    
+    def add_rows(self, processing_info, program_data):
+        """Attach the output rows built for a page"""
+        with self.lock:
+            entry = self.entries.setdefault(processing_info['URL'], {'hash': None, 'extracted': None})
+            entry['processing'] = processing_info
+            entry['main'] = program_data
+    
+    def changelog(self, previous):
+        """Programs added, removed or with a different fee compared with a previous state"""
+        changes = []
+        for url, entry in self.entries.items():
+            old = previous.entries.get(url)
+            row = entry.get('processing') or {}
+            if old is None:
+                changes.append(self.change('added', url, row))
+                continue
+            
+            old_fee = (old.get('main') or {}).get('ค่าเทอม_บาท')
+            new_fee = (entry.get('main') or {}).get('ค่าเทอม_บาท')
+            if cost_parts(old.get('processing')) != cost_parts(row) or old_fee != new_fee:
+                change = self.change('fee_changed', url, row)
+                change['ค่าใช้จ่าย_เดิม'] = (old.get('processing') or {}).get('ค่าใช้จ่าย')
+                change['ค่าเทอม_บาท_เดิม'] = old_fee
+                change['ค่าเทอม_บาท'] = new_fee
+                changes.append(change)
+        
+        for url, old in previous.entries.items():
+            if url not in self.entries:
+                changes.append(self.change('removed', url, old.get('processing') or {}))
+        return changes
+    
+    def change(self, kind, url, row):
+        return {
+            'การเปลี่ยนแปลง': kind,
+            'มหาวิทยาลัย': row.get('มหาวิทยาลัย'),
+            'หลักสูตร': row.get('หลักสูตร'),
+            'ค่าใช้จ่าย': row.get('ค่าใช้จ่าย'),
+            'URL': url
+        }
+    
+    def save(self, filename):
+        """Write the state atomically"""
+        tmp_file = f"{filename}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, default=str)
+        os.replace(tmp_file, filename)
+
+
+def journal_filename(excel_file):
+    """Checkpoint journal kept next to the output workbook"""
+    return os.path.splitext(excel_file)[0] + ".journal.jsonl"
+
+
+class CrawlJournal:
+    """Append-only checkpoint journal of a crawl, lets an interrupted run resume where it stopped"""
+    def __init__(self, filename, resume=False, checkpoint_every=10):
+        self.filename = filename
+        self.checkpoint_every = checkpoint_every
+        self.search_results = None
+        self.completed = {}
+        self.pending = 0
+        self.lock = threading.Lock()
+        
+        if resume and os.path.exists(filename):
+            self.load()
+            self.file = open(filename, 'a', encoding='utf-8')
+        else:
+            if self.has_checkpoint(filename):
+                # Starting over, keep the old checkpoint aside instead of truncating it
+                os.replace(filename, f"{filename}.old")
+                print(f"Moved the previous checkpoint to {filename}.old")
+            self.file = open(filename, 'w', encoding='utf-8')
+    
+    @staticmethod
+    def has_checkpoint(filename):
+        """True when an interrupted crawl left a non-empty journal"""
+        return os.path.exists(filename) and os.path.getsize(filename) > 0
+    
+    def load(self):
+        """Read completed work back from the journal"""
+        good_bytes = 0
+        with open(self.filename, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves a torn last line, everything before it is intact
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                good_bytes += len(line)
+                if record['type'] == 'search':
+                    self.search_results = record['results']
+                elif record['type'] == 'program':
+                    self.completed[record['url']] = record
+        
+        # Cut the torn line off so new records start on a fresh line
+        with open(self.filename, 'r+b') as f:
+            f.truncate(good_bytes)
+        print(f"Resuming from {self.filename}: {len(self.completed)} programs already done")
+    
+    def write(self, record):
+        with self.lock:
+            self.file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            self.file.flush()
+            self.pending += 1
+            if self.pending >= self.checkpoint_every:
+                os.fsync(self.file.fileno())
+                self.pending = 0
+    
+    def add_search(self, search_results):
+        """Checkpoint the URL queue, a resumed run works through the same list in the same order"""
+        self.search_results = search_results
+        self.write({'type': 'search', 'results': search_results})
+    
+    def add_program(self, url, processing_info, program_data, content_hash=None, extracted=None):
+        """Checkpoint the rows of one finished program, with the page hash and extraction the state keeps"""
+        self.write({'type': 'program', 'url': url, 'processing': processing_info, 'main': program_data,
+                    'hash': content_hash, 'extracted': extracted})
+    
+    def restored(self, url, i):
+        """Rows of a program finished before the interruption, renumbered to its current position"""
+        record = self.completed[url]
+        processing_info, program_data = copy.deepcopy((record['processing'], record['main']))
+        processing_info['ลำดับ'] = i
+        return processing_info, program_data
+    
+    def restored_page(self, url):
+        """Page hash and extraction of a finished program, None for journals written without them"""
+        record = self.completed[url]
+        return record.get('hash'), copy.deepcopy(record.get('extracted'))
+    
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+    
+    def discard(self):
+        """Remove the journal once the crawl has been saved"""
+        self.close()
+        os.remove(self.filename)
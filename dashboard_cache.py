@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+import plotly.io as pio
+
+
+def selection(value):
+    """Dropdown value as a sorted tuple, a single value and a one-item list give the same key"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        return (value,)
+    return tuple(sorted(value))
+
+
+def filter_key(version, selected_type, selected_uni, keyword, data_filter, tuition_range):
+    """Cache key of one dashboard query: filters that give the same rows give the same key"""
+    return (
+        version,
+        selection(selected_type),
+        selection(selected_uni),
+        # The search ignores case, and an empty box is no search
+        keyword.lower() if keyword else None,
+        data_filter if data_filter in ('with_tuition', 'without_tuition') else 'all',
+        tuple(tuition_range) if tuition_range else None
+    )
+
+
+class FilterCache:
+    """In-process LRU cache of filter results, entries also expire after a time-to-live"""
+    def __init__(self, max_entries=256, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (time stored, value), least recently used first
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+    
+    def get(self, key):
+        """Cached value of a key, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self.entries[key]
+                self.stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+    
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evicted'] += 1
+    
+    def get_or_compute(self, key, compute):
+        """Cached value, or compute and store it. Computing happens outside the lock"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+    
+    def summary(self):
+        """Hit/miss counters, hit rate and size, e.g. for a stats endpoint"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, entries=len(self.entries), max_entries=self.max_entries,
+                        hit_rate=self.stats['hits'] / lookups if lookups else None)
+
+
+class DiskCache:
+    """Values as files in a directory every worker process reads and writes, bounded in total size"""
+    suffix = ".pkl"
+    
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # Bytes this worker wrote since it last checked the directory size
+        self.written = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+    
+    def encode(self, value):
+        # Only this dashboard's own workers write the directory
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def decode(self, data):
+        return pickle.loads(data)
+    
+    def path(self, key, name):
+        # repr() of the key is the same in every process, unlike hash()
+        digest = hashlib.sha1(repr((key, name)).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + self.suffix)
+    
+    def get(self, key, name):
+        """Cached value, or None"""
+        path = self.path(key, name)
+        try:
+            with open(path, 'rb') as f:
+                value = self.decode(f.read())
+            # The modification time doubles as the last use, eviction removes the oldest files first
+            os.utime(path)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            value = None
+        with self.lock:
+            self.stats['hits' if value is not None else 'misses'] += 1
+        return value
+    
+    def put(self, key, name, value):
+        path = self.path(key, name)
+        data = self.encode(value)
+        # Write to a file of this process and rename it, other workers never read a partial value
+        tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+        
+        with self.lock:
+            self.written += len(data)
+            if self.written < self.max_bytes // 10:
+                return
+            self.written = 0
+        self.evict()
+    
+    def evict(self):
+        """Remove the least recently used values until the directory is below its size limit"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Another worker removed it first
+                pass
+            total -= size
+            with self.lock:
+                self.stats['evicted'] += 1
+    
+    def get_or_build(self, key, name, build):
+        """Cached value, or build it and share it with the other workers"""
+        value = self.get(key, name)
+        if value is None:
+            value = build()
+            self.put(key, name, value)
+        return value
+    
+    def summary(self):
+        """Hit/miss counters and hit rate of this worker"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, hit_rate=self.stats['hits'] / lookups if lookups else None)
+
+
+class FigureCache(DiskCache):
+    """Plotly figures as JSON files shared by every worker process"""
+    suffix = ".json"
+    
+    def __init__(self, directory=".figure_cache", max_bytes=64 * 1024 * 1024):
+        super().__init__(directory, max_bytes)
+    
+    def encode(self, figure):
+        return pio.to_json(figure, validate=False).encode('utf-8')
+    
+    def decode(self, data):
+        return json.loads(data)
+
+
+class ResultCache(DiskCache):
+    """Filtered row positions and statistics per filter key, pickled and shared by every worker process:
+    the callbacks of one filter change land on different workers, only the first one computes them"""
+    def __init__(self, directory=".filter_cache", max_bytes=256 * 1024 * 1024):
+        super().__init__(directory, max_bytes)
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+import pandas as pd
+from indexes import CategoryIndex, TextIndex, TuitionIndex
+from aggregates import AggregateCube
+
+# Dashboard dataset: the Parquet snapshot written by pipeline.py, or rebuilt here from the workbook
+SNAPSHOT_FILE = 'final_data.parquet'
+EXCEL_FILE = 'final_data.xlsx'
+# Few distinct values repeated over every row, stored as integer codes plus one copy of each value
+CATEGORY_COLUMNS = ['ชื่อมหาวิทยาลัย', 'ประเภทหลักสูตร']
+
+
+def snapshot_is_stale(snapshot=SNAPSHOT_FILE, excel=EXCEL_FILE):
+    """True when the workbook was saved after the snapshot was written, or there is no snapshot yet"""
+    if not os.path.exists(excel):
+        return False
+    return not os.path.exists(snapshot) or os.path.getmtime(excel) > os.path.getmtime(snapshot)
+
+
+def with_categories(df):
+    """The categorical columns as pandas categoricals"""
+    return df.astype({column: 'category' for column in CATEGORY_COLUMNS if column in df.columns})
+
+
+def write_snapshot(df, snapshot=SNAPSHOT_FILE):
+    """Write the snapshot atomically, several dashboard workers may rebuild it at the same time"""
+    tmp_file = f"{snapshot}.{os.getpid()}.tmp"
+    with_categories(df).to_parquet(tmp_file, index=False)
+    os.replace(tmp_file, snapshot)
+
+
+def load_dataset(snapshot=SNAPSHOT_FILE, excel=EXCEL_FILE):
+    """Dashboard rows from the snapshot, converting the workbook first when it is newer"""
+    start = time.perf_counter()
+    if snapshot_is_stale(snapshot, excel):
+        write_snapshot(pd.read_excel(excel), snapshot)
+        print(f"Rebuilt {snapshot} from {excel} in {time.perf_counter() - start:.2f}s")
+
+    # Memory-mapped read: the file's pages are shared through the OS cache instead of copied per worker
+    df = with_categories(pd.read_parquet(snapshot, memory_map=True))
+    print(f"Loaded {len(df)} rows from {snapshot} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return df
+
+
+def file_signature(*filenames):
+    """Modification time and size of each file, changes whenever one of them is rewritten"""
+    signature = []
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+            signature.append(f"{stat.st_mtime_ns}-{stat.st_size}")
+        except OSError:
+            signature.append("missing")
+    return ":".join(signature)
+
+
+def dropdown_options(values):
+    """Sorted dropdown options of the values present in a column"""
+    return [{'label': value, 'value': value} for value in sorted(values.dropna().unique())]
+
+
+class Dataset:
+    """One version of the dashboard data and everything derived from it, never modified once built"""
+    def __init__(self, df, version):
+        self.df = df
+        self.version = version
+        self.type_options = dropdown_options(df['ประเภทหลักสูตร'])
+        self.uni_options = dropdown_options(df['ชื่อมหาวิทยาลัย'])
+        # Row bitmaps of the dropdown filters, the n-gram index of the search box and the fee-sorted rows
+        self.type_index = CategoryIndex(df['ประเภทหลักสูตร'])
+        self.uni_index = CategoryIndex(df['ชื่อมหาวิทยาลัย'])
+        self.text_index = TextIndex(df)
+        self.tuition_index = TuitionIndex(df['ค่าเทอมต่อเทอม_ประมาณ'])
+        # Course counts and fee sums per type × university × fee, the statistics of a filter without a search
+        self.cube = AggregateCube(self.type_index, self.uni_index, self.tuition_index)
+
+
+class DatasetWatcher:
+    """Reloads the dataset in a background thread whenever the snapshot or the workbook changes"""
+    def __init__(self, snapshot=SNAPSHOT_FILE, excel=EXCEL_FILE, interval=5):
+        self.snapshot = snapshot
+        self.excel = excel
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.current = self.load()
+        self.thread = None
+        # Process the thread runs in, a worker forked after start() has the thread object but not the thread
+        self.pid = None
+    
+    def load(self):
+        df = load_dataset(self.snapshot, self.excel)
+        # Read the signature after loading, a rebuilt snapshot is part of this version
+        return Dataset(df, file_signature(self.snapshot, self.excel))
+    
+    def check(self):
+        """Swap in a new dataset if the files changed, callbacks already running keep the one they took"""
+        with self.lock:
+            if file_signature(self.snapshot, self.excel) == self.current.version:
+                return False
+            try:
+                dataset = self.load()
+            except Exception as e:
+                # e.g. a workbook that is still being saved, try again on the next check
+                print(f"Failed to reload dataset: {e}")
+                return False
+            # A single reference assignment, readers see either the old or the new dataset
+            self.current = dataset
+        print(f"Dataset reloaded: {len(dataset.df)} rows")
+        return True
+    
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
+    
+    def start(self):
+        """Start polling the files, once per process: call it from the process serving the requests"""
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self.thread = threading.Thread(target=self.run, name="dataset-watcher", daemon=True)
+                    self.thread.start()
+                    self.pid = os.getpid()
+        return self
@@ -0,0 +1,118 @@
+import re
+
+# Anchor of the patterns that start at an amount of money, e.g. "25,000 บาท". A digit right after another
+# digit is never a new match start, so only the first digit of a number is reported
+AMOUNT = r'(?<!\d)\d[\d,]*\s*(?:บาท|บ\.)'
+
+
+class FieldPattern:
+    """A field regex and the anchor its matches begin with, the scanner only stops at anchors"""
+    def __init__(self, field, pattern, anchors, flags=re.IGNORECASE, from_line_start=False):
+        self.field = field
+        self.regex = re.compile(pattern, flags)
+        # Tuple of words, or AMOUNT
+        self.anchors = anchors
+        # Match starts at the beginning of the sentence or line the anchor is in, not at the anchor
+        self.from_line_start = from_line_start
+
+
+# Patterns of each field in priority order, the same ones the parsers used to run one by one
+FIELD_PATTERNS = [
+    FieldPattern('university', r'([^.\n]*(?:มหาวิทยาลัย|สถาบัน)[^.\n]*)', ('มหาวิทยาลัย', 'สถาบัน'),
+                 flags=0, from_line_start=True),
+    
+    FieldPattern('course_type', r'ประเภทหลักสูตร[:\s]*([^\n]+)', ('ประเภท',)),
+    FieldPattern('course_type', r'ประเภท[:\s]*([^\n]+)', ('ประเภท',)),
+    FieldPattern('course_type', r'(ภาษาไทย|ภาษาอังกฤษ|นานาชาติ|ปกติ|พิเศษ|บางเวลา|เต็มเวลา)',
+                 ('ภาษาไทย', 'ภาษาอังกฤษ', 'นานาชาติ', 'ปกติ', 'พิเศษ', 'บางเวลา', 'เต็มเวลา')),
+    FieldPattern('course_type', r'(ปกติ|พิเศษ|นานาชาติ|International|Regular|Special)',
+                 ('ปกติ', 'พิเศษ', 'นานาชาติ', 'International', 'Regular', 'Special')),
+    
+    FieldPattern('cost', r'ค่าใช้จ่าย[:\s]*([^\n]+)', ('ค่าใช้จ่าย',)),
+    FieldPattern('cost', r'อัตราค่าเรียน[:\s]*([^\n]+)', ('อัตราค่า',)),
+    FieldPattern('cost', r'อัตราค่าลำเรียน[:\s]*([^\n]+)', ('อัตราค่า',)),
+    FieldPattern('cost', r'ค่าเทอม[:\s]*([^\n]+)', ('ค่าเทอม',)),
+    FieldPattern('cost', r'ค่าธรรมเนียม[:\s]*([^\n]+)', ('ค่าธรรมเนียม',)),
+    FieldPattern('cost', r'(\d+(?:,\d+)*\s*(?:บาท|บ\.)[^\n]*(?:เทอม|ภาค|ปี|หลักสูตร))', AMOUNT),
+    FieldPattern('cost', r'(อัตราค่า[^\n]*\d+(?:,\d+)*[^\n]*บาท)', ('อัตราค่า',)),
+    FieldPattern('cost', r'(ค่าลำเรียน[^\n]*\d+(?:,\d+)*[^\n]*บาท)', ('ค่าลำเรียน',)),
+    
+    FieldPattern('tuition_fee', r'ค่าเทอม[:\s]*(\d+(?:,\d+)*)\s*บาท', ('ค่าเทอม',)),
+    FieldPattern('tuition_fee', r'ค่าใช้จ่าย[:\s]*(\d+(?:,\d+)*)\s*บาท', ('ค่าใช้จ่าย',)),
+    FieldPattern('tuition_fee', r'อัตราค่าเทอม[:\s]*(\d+(?:,\d+)*)\s*บาท', ('อัตราค่า',)),
+    FieldPattern('tuition_fee', r'(\d+(?:,\d+)*)\s*บาท[/\s]*เทอม', AMOUNT),
+    FieldPattern('tuition_fee', r'(\d+(?:,\d+)*)\s*บาท[/\s]*ปี', AMOUNT),
+]
+
+
+class ExtractionEngine:
+    """Runs every field pattern over a page's text in one scan"""
+    def __init__(self, patterns=FIELD_PATTERNS):
+        self.patterns = patterns
+        self.fields = list(dict.fromkeys(pattern.field for pattern in patterns))
+        
+        # Anchor -> patterns whose matches can start where the anchor starts
+        self.word_patterns = {}
+        self.amount_patterns = []
+        for index, pattern in enumerate(patterns):
+            if pattern.anchors == AMOUNT:
+                self.amount_patterns.append(index)
+                continue
+            for word in pattern.anchors:
+                self.word_patterns.setdefault(word.lower(), []).append(index)
+        
+        words = sorted(self.word_patterns, key=len, reverse=True)
+        # The scanner reports the longest word at a position, which also starts every shorter word it begins with
+        for word in words:
+            for other in words:
+                if other != word and word.startswith(other):
+                    self.word_patterns[word] = sorted(set(self.word_patterns[word] + self.word_patterns[other]))
+        
+        # All anchors in one lookahead alternation, so an anchor inside another one (ค่าเทอม in อัตราค่าเทอม)
+        # is still found. The leading character class lets the regex engine skip text that cannot start any anchor
+        first_chars = {char for word in words for char in (word[0], word[0].upper())}
+        branches = [f"(?P<word>{'|'.join(re.escape(word) for word in words)})"]
+        if self.amount_patterns:
+            first_chars.update('0123456789')
+            branches.append(f"(?P<amount>{AMOUNT})")
+        char_class = ''.join(re.escape(char) for char in sorted(first_chars))
+        self.scanner = re.compile(f"(?=[{char_class}])(?={'|'.join(branches)})", re.IGNORECASE)
+    
+    def matches(self, text):
+        """Each pattern's re.findall() result, found with a single pass over the text"""
+        found = [[] for _ in self.patterns]
+        # findall() never returns overlapping matches of one pattern, resume each pattern after its last match
+        resume_at = [0] * len(self.patterns)
+        for hit in self.scanner.finditer(text):
+            if hit.lastgroup == 'amount':
+                indexes = self.amount_patterns
+            else:
+                indexes = self.word_patterns[hit.group('word').lower()]
+            
+            for index in indexes:
+                pattern = self.patterns[index]
+                start = hit.start()
+                if pattern.from_line_start:
+                    start = max(text.rfind('.', 0, start), text.rfind('\n', 0, start)) + 1
+                if start < resume_at[index]:
+                    continue
+                match = pattern.regex.match(text, start)
+                if match:
+                    found[index].append(match.group(1))
+                    resume_at[index] = max(match.end(), start + 1)
+        return found
+    
+    def extract(self, text):
+        """Every field at once: for each field, the matches of its patterns in priority order"""
+        fields = {field: [] for field in self.fields}
+        for pattern, matches in zip(self.patterns, self.matches(text)):
+            fields[pattern.field].append(matches)
+        return fields
+
+
+ENGINE = ExtractionEngine()
+
+
+def extract_fields(text):
+    """Field matches of a page text, using the engine compiled at import"""
+    return ENGINE.extract(text)
@@ -0,0 +1,165 @@
+import queue
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from pages import HtmlPage, course_text_ready
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+class HttpFetcher:
+    """Fetch course pages over pooled keep-alive HTTP connections without starting a browser"""
+    def __init__(self, pool_size=10, timeout=15, cache=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/json;q=0.9,*/*;q=0.8',
+            'Accept-Encoding': 'gzip, deflate'
+        })
+        self.lock = threading.Lock()
+        self.stats = {'http_pages': 0, 'needs_javascript': 0, 'errors': 0}
+    
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+    
+    def fetch(self, url):
+        """Return the served page, or None when it has to be rendered by a browser"""
+        # Revalidate a cached copy with If-None-Match/If-Modified-Since instead of downloading it again
+        headers = self.cache.conditional_headers(url) if self.cache else {}
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+            if response.status_code == 304:
+                page = self.cache.revalidated(url)
+                if page is not None:
+                    self.count('http_pages')
+                    return page
+                response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {url}: {e}")
+            self.count('errors')
+            return None
+        
+        page = self.page_from_response(url, response)
+        
+        # Pages that only render their content with JavaScript go to the browser instead
+        if not course_text_ready(page.text):
+            self.count('needs_javascript')
+            return None
+        
+        if self.cache:
+            self.cache.store(page, etag=response.headers.get('ETag'),
+                             last_modified=response.headers.get('Last-Modified'))
+        self.count('http_pages')
+        return page
+    
+    def revalidate(self, url):
+        """Cached page if the server answers 304 Not Modified to its validators, None when it changed or
+        the cache holds no validators. The body of a changed page is not downloaded"""
+        headers = self.cache.conditional_headers(url) if self.cache else {}
+        if not headers:
+            return None
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers, stream=True)
+            response.close()
+        except requests.RequestException as e:
+            print(f"HTTP revalidation failed for {url}: {e}")
+            self.count('errors')
+            return None
+        if response.status_code != 304:
+            return None
+        return self.cache.revalidated(url)
+    
+    def validators(self, url):
+        """ETag and Last-Modified of a URL, None for the ones the server does not send. Only a body that holds
+        the course text is vouched for by them: for a shell filled in by JavaScript a 304 says nothing about
+        the fees, so such pages get none and expire on the cache TTL"""
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            return None, None
+        if not course_text_ready(self.page_from_response(url, response).text):
+            self.count('needs_javascript')
+            return None, None
+        return response.headers.get('ETag'), response.headers.get('Last-Modified')
+    
+    def page_from_response(self, url, response):
+        """Turn an HTML or JSON response into a page the extractors can read"""
+        if 'json' in response.headers.get('Content-Type', ''):
+            return HtmlPage(url, '', text='\n'.join(json_lines(response.json())))
+        
+        # requests falls back to latin-1 for text/html without a charset, the site serves utf-8
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = 'utf-8'
+        return HtmlPage(url, response.text)
+    
+    def print_stats(self):
+        print(f"HTTP pages: {self.stats['http_pages']}, "
+              f"browser fallbacks: {self.stats['needs_javascript']}, "
+              f"HTTP errors: {self.stats['errors']}")
+    
+    def close(self):
+        self.session.close()
+
+
+def json_lines(value, key=None):
+    """Flatten a JSON document into 'key: value' lines so the text regexes can run on it"""
+    if isinstance(value, dict):
+        for child_key, child in value.items():
+            yield from json_lines(child, child_key)
+    elif isinstance(value, list):
+        for child in value:
+            yield from json_lines(child, key)
+    elif value is not None:
+        yield f"{key}: {value}" if key else str(value)
+
+
+class DriverPool:
+    """Chrome drivers shared by worker threads, a new one is started only when all are busy"""
+    def __init__(self, create_driver, first_driver, size):
+        self.create_driver = create_driver
+        self.idle = queue.LifoQueue()
+        self.idle.put(first_driver)
+        self.remaining = size - 1
+        self.started = []
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take an idle driver, starting a new one if the pool has room"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self.lock:
+            can_start = self.remaining > 0
+            if can_start:
+                self.remaining -= 1
+        
+        if can_start:
+            try:
+                driver = self.create_driver()
+            except Exception as e:
+                print(f"Error initializing worker driver: {e}")
+            else:
+                with self.lock:
+                    self.started.append(driver)
+                return driver
+        
+        return self.idle.get()
+    
+    def release(self, driver):
+        self.idle.put(driver)
+    
+    def close(self):
+        """Quit the drivers started by the pool"""
+        for driver in self.started:
+            driver.quit()
+        self.started = []
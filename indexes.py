@@ -0,0 +1,124 @@
+import numpy as np
+
+# Longest n-gram indexed. A search term is looked up by its n-grams of this length, shorter terms by their own
+NGRAM = 3
+# Posting lists intersected per term, the rarest ones. The candidates left are checked against the text anyway
+MAX_GRAMS = 3
+
+
+def row_texts(df):
+    """Lowercased text of every row: the value of each column, one per line. Numbers are written as str()
+    writes them, a fee as 25500.0, so searching 25500 finds it as the search on str(row) did"""
+    values = df.astype(object).where(df.notna(), "")
+    return ["\n".join(map(str, row)).lower() for row in values.itertuples(index=False)]
+
+
+def ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TextIndex:
+    """Character n-gram inverted index of the rows' text, for substring search without scanning every row.
+    Thai is written without spaces between words, so words cannot be indexed, but any substring of at least
+    NGRAM characters contains the n-grams of the text it occurs in"""
+    def __init__(self, df, n=NGRAM):
+        self.n = n
+        self.texts = row_texts(df)
+        postings = {}
+        for row, text in enumerate(self.texts):
+            grams = set()
+            for size in range(1, n + 1):
+                grams.update(ngrams(text, size))
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        # n-gram -> sorted row positions
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+        self.all_rows = np.arange(len(self.texts), dtype=np.int32)
+        # term -> matching rows, the same terms come back as the user edits the rest of the query
+        self.term_rows = {}
+    
+    def candidates(self, term):
+        """Rows holding every n-gram of the term, a superset of the rows containing it"""
+        grams = ngrams(term, min(len(term), self.n))
+        rows = None
+        postings = sorted((self.postings.get(gram, self.all_rows[:0]) for gram in grams), key=len)
+        for posting in postings[:MAX_GRAMS]:
+            rows = posting if rows is None else np.intersect1d(rows, posting, assume_unique=True)
+            if len(rows) == 0:
+                break
+        return rows
+    
+    def term_matches(self, term):
+        """Sorted positions of the rows containing the term"""
+        matches = self.term_rows.get(term)
+        if matches is None:
+            matches = self.candidates(term)
+            if len(term) > self.n:
+                # The n-grams can all occur without forming the term, confirm on the text of the candidates
+                matches = np.array([row for row in matches if term in self.texts[row]], dtype=np.int32)
+            if len(self.term_rows) >= 4096:
+                self.term_rows.clear()
+            self.term_rows[term] = matches
+        return matches
+    
+    def search(self, query):
+        """Sorted positions of the rows containing every whitespace-separated term of the query, ignoring case"""
+        rows = self.all_rows
+        # Rarest term first, the intersection only gets smaller
+        for matches in sorted((self.term_matches(term) for term in query.lower().split()), key=len):
+            rows = np.intersect1d(rows, matches, assume_unique=True)
+            if len(rows) == 0:
+                break
+        return rows
+    
+    def mask(self, query):
+        """Row bitmap of search()"""
+        bitmap = np.zeros(len(self.texts), dtype=bool)
+        bitmap[self.search(query)] = True
+        return bitmap
+
+
+class CategoryIndex:
+    """Row bitmap of every value of a categorical column, a filter on several values is an OR of bitmaps"""
+    def __init__(self, values):
+        values = values.astype('category')
+        # Category code of every row (-1 for a missing value) and the value behind each code
+        self.codes = values.cat.codes.to_numpy()
+        self.categories = values.cat.categories.to_numpy(dtype=object)
+        self.code_of = {value: code for code, value in enumerate(self.categories)}
+        self.bitmaps = {value: self.codes == code for value, code in self.code_of.items()}
+        self.empty = np.zeros(len(self.codes), dtype=bool)
+    
+    def selected_codes(self, selected):
+        """Category codes of the selected values, values the column does not hold have none"""
+        if isinstance(selected, str):
+            selected = [selected]
+        return np.array([self.code_of[value] for value in selected if value in self.code_of], dtype=self.codes.dtype)
+    
+    def mask(self, selected):
+        """Bitmap of the rows with any of the selected values, one value or a list of them"""
+        if isinstance(selected, str):
+            return self.bitmaps.get(selected, self.empty)
+        bitmap = self.empty.copy()
+        for value in selected:
+            bitmap |= self.bitmaps.get(value, self.empty)
+        return bitmap
+
+
+class TuitionIndex:
+    """Row positions sorted by fee, a fee range is two binary searches instead of a scan of the column"""
+    def __init__(self, fees):
+        self.fees = fees.to_numpy(dtype=float)
+        self.unknown = np.isnan(self.fees)
+        self.known = ~self.unknown
+        rows = np.flatnonzero(self.known)
+        self.sorted_rows = rows[np.argsort(self.fees[rows], kind='stable')]
+        self.sorted_fees = self.fees[self.sorted_rows]
+    
+    def range_mask(self, low, high):
+        """Bitmap of the rows with a fee from low to high, both included"""
+        start = np.searchsorted(self.sorted_fees, low, side='left')
+        end = np.searchsorted(self.sorted_fees, high, side='right')
+        bitmap = np.zeros(len(self.known), dtype=bool)
+        bitmap[self.sorted_rows[start:end]] = True
+        return bitmap
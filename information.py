@@ -1,37 +1,174 @@
 import pandas as pd
 import time
-import re
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
+from pages import DOM_MODES, DriverPage, PageWaiter, course_page_ready, search_results_ready
+from fetchers import USER_AGENT, DriverPool, HttpFetcher
+from page_cache import PageCache, content_hash
+from tuition import MAX_SEMESTER_FEE, per_semester, to_amount
+from crawl_state import CrawlJournal, CrawlState, journal_filename, state_filename
+
+class RateLimiter:
+    """Global polite rate limit shared by all browser workers"""
+    def __init__(self, requests_per_second=1.0):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+    
+    def wait(self):
+        """Block until the next request slot is available"""
+        if not self.interval:
+            return
+        
+        # Reserve a slot under the lock, sleep outside it so other workers can queue up
+        with self.lock:
+            slot = max(time.monotonic(), self.next_slot)
+            self.next_slot = slot + self.interval
+        
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+# Links to program pages on the search results list
+COURSE_LINK_SELECTOR = "a[href*='course'], a[href*='program']"
+# Words in a result title that mark it as an engineering program
+ENGINEERING_WORDS = ['วิศวกรรม', 'engineering', 'วศ.บ']
+# CSS selectors for the course and university names, in the order they are tried
+COURSE_NAME_SELECTORS = [
+    "h1", "h2", ".course-name", ".program-name",
+    "[class*='title']", "[class*='name']"
+]
+UNIVERSITY_SELECTORS = [
+    ".university-name", ".institution-name",
+    "[class*='university']", "[class*='institution']"
+]
+# The Processing_Data row falls back to a few more
+PROCESSING_COURSE_NAME_SELECTORS = COURSE_NAME_SELECTORS + [".course-title"]
+PROCESSING_UNIVERSITY_SELECTORS = UNIVERSITY_SELECTORS + [".school-name", "[class*='school']"]
+# Every selector a course page is queried with, read in one batch when the DOM mode allows it
+PAGE_SELECTORS = list(dict.fromkeys(PROCESSING_COURSE_NAME_SELECTORS + PROCESSING_UNIVERSITY_SELECTORS))
 
 class TCASEngineeringScraper:
-    def __init__(self):
+    def __init__(self, workers=1, rate_limit=1.0, wait_timeouts=None, backend="selenium",
+                 cache_dir=".page_cache", cache_ttl=6 * 3600, previous_state=None, journal=None,
+                 dom_mode="script", fetcher=None, start_browser=True):
         self.data = []
         self.processing_data = []  # New list to store processing information
-        self.setup_driver()
+        # Checkpoint journal, every finished program is written there as soon as it is done
+        self.journal = journal
+        # Incremental mode: pages whose content hash matches the previous run reuse its extraction
+        self.previous_state = previous_state
+        self.state = CrawlState()
+        self.changelog = []
+        self.carried_forward = 0
+        self.workers = max(1, workers)
+        self.lock = threading.Lock()
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.waiter = PageWaiter(wait_timeouts)
+        self.dom_mode = dom_mode
+        self.page_cache = PageCache(cache_dir, ttl=cache_ttl) if cache_dir else None
+        # The HTTP backend serves course pages without a browser, Chrome is only used for pages that need JS
+        # and for the keyword search, a JavaScript form, so it is still started here.
+        # A fetcher passed in (e.g. replay.ReplayFetcher) takes its place
+        self.http_fetcher = fetcher
+        if fetcher is None and backend == "http":
+            self.http_fetcher = HttpFetcher(pool_size=self.workers, cache=self.page_cache)
+        # With the Chrome backend HTTP only asks whether a stale cached page changed (If-None-Match /
+        # If-Modified-Since), an unchanged page is then neither downloaded nor rendered again. Pages whose
+        # content is loaded by JavaScript cannot be asked this way and are rendered again once stale
+        self.revalidator = None
+        if fetcher is None and backend == "selenium" and self.page_cache:
+            self.revalidator = HttpFetcher(pool_size=self.workers, cache=self.page_cache)
+        # Per-field extraction times, only collected by the replay benchmark
+        self.field_timer = None
+        if start_browser:
+            self.setup_driver()
+        else:
+            self.driver = None
+        self.driver_pool = DriverPool(self.create_driver, self.driver, self.workers)
     
-    def setup_driver(self):
-        """Setup Chrome driver with options"""
+    def create_driver(self):
+        """Create a new Chrome driver instance"""
         chrome_options = Options()
         # chrome_options.add_argument("--headless")  # Remove this line if you want to see the browser
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+        chrome_options.add_argument(f"--user-agent={USER_AGENT}")
         
+        return webdriver.Chrome(options=chrome_options)
+    
+    def setup_driver(self):
+        """Setup Chrome driver with options"""
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = self.create_driver()
             print("Chrome driver initialized successfully")
         except Exception as e:
             print(f"Error initializing Chrome driver: {e}")
             print("Please make sure ChromeDriver is installed and in PATH")
             self.driver = None
     
+    def search_keyword(self, keyword, driver=None, title_words=ENGINEERING_WORDS):
+        """Search a single keyword and return the matching program links"""
+        driver = driver or self.driver
+        results = []
+        
+        print(f"\nSearching for: {keyword}")
+        try:
+            # Navigate to TCAS search page
+            self.rate_limiter.wait()
+            driver.get("https://course.mytcas.com")
+            
+            # Find search box and enter keyword
+            search_box = self.waiter.wait(
+                driver, 'search_page',
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input[placeholder*='วิชา'], input[type='text']")),
+                required=True
+            )
+            search_box.clear()
+            search_box.send_keys(keyword)
+            # Links already on the page, the results of this search have to replace them
+            previous_links = driver.find_elements(By.CSS_SELECTOR, COURSE_LINK_SELECTOR)
+            search_box.send_keys(Keys.RETURN)
+            
+            # Wait for results to load
+            self.waiter.wait(driver, 'search_results', search_results_ready(COURSE_LINK_SELECTOR, previous_links))
+            
+            # Find all course links
+            course_links = driver.find_elements(By.CSS_SELECTOR, COURSE_LINK_SELECTOR)
+            
+            for link in course_links:
+                try:
+                    course_url = link.get_attribute("href")
+                    course_title = link.text.strip()
+                    
+                    # Filter for engineering programs only (title_words=None keeps every program)
+                    if course_url and course_title and (
+                            title_words is None or any(word in course_title.lower() for word in title_words)):
+                        results.append({
+                            'title': course_title,
+                            'url': course_url,
+                            'keyword': keyword
+                        })
+                        print(f"Found: {course_title}")
+                except Exception as e:
+                    continue
+            
+            print(f"Found {len(results)} results for {keyword}")
+            
+        except Exception as e:
+            print(f"Error searching for {keyword}: {e}")
+        
+        return results
+    
     def search_engineering_programs(self, keywords):
         """Search for engineering programs using specific keywords"""
         if not self.driver:
@@ -39,50 +176,8 @@ class TCASEngineeringScraper:
             return []
         
         search_results = []
-        
         for keyword in keywords:
-            print(f"\nSearching for: {keyword}")
-            try:
-                # Navigate to TCAS search page
-                self.driver.get("https://course.mytcas.com")
-                time.sleep(3)
-                
-                # Find search box and enter keyword
-                search_box = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "input[placeholder*='วิชา'], input[type='text']"))
-                )
-                search_box.clear()
-                search_box.send_keys(keyword)
-                search_box.send_keys(Keys.RETURN)
-                
-                # Wait for results to load
-                time.sleep(5)
-                
-                # Find all course links
-                course_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='course'], a[href*='program']")
-                
-                for link in course_links:
-                    try:
-                        course_url = link.get_attribute("href")
-                        course_title = link.text.strip()
-                        
-                        # Filter for engineering programs only
-                        if course_url and course_title and any(eng_word in course_title.lower() for eng_word in ['วิศวกรรม', 'engineering', 'วศ.บ']):
-                            search_results.append({
-                                'title': course_title,
-                                'url': course_url,
-                                'keyword': keyword
-                            })
-                            print(f"Found: {course_title}")
-                    except Exception as e:
-                        continue
-                
-                print(f"Found {len([r for r in search_results if r['keyword'] == keyword])} results for {keyword}")
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"Error searching for {keyword}: {e}")
-                continue
+            search_results.extend(self.search_keyword(keyword))
         
         # Remove duplicates based on URL
         unique_results = []
@@ -95,247 +190,284 @@ class TCASEngineeringScraper:
         print(f"\nTotal unique programs found: {len(unique_results)}")
         return unique_results
     
-    def extract_processing_info(self, course_url):
+    def load_page(self, course_url, driver=None):
+        """Load a course page once and capture it for extraction"""
+        driver = driver or self.driver
+        self.rate_limiter.wait()
+        driver.get(course_url)
+        
+        # Wait for page to load, falls through with whatever rendered if the markers never show up
+        self.waiter.wait(driver, 'course_page', course_page_ready)
+        
+        return DriverPage(driver, course_url, dom_mode=self.dom_mode, selectors=PAGE_SELECTORS)
+    
+    def empty_processing_info(self, course_url):
+        """Processing row used when a page could not be loaded"""
+        return {
+            'หลักสูตร': "N/A",
+            'มหาวิทยาลัย': "N/A",
+            'ประเภทหลักสูตร': "N/A",
+            'ค่าใช้จ่าย': "N/A",
+            'URL': course_url
+        }
+    
+    @contextmanager
+    def open_page(self, course_url):
+        """Yield a loaded course page, served over HTTP when possible and rendered in Chrome otherwise"""
+        if self.page_cache:
+            page = self.page_cache.get_fresh(course_url)
+            if page is None and self.revalidator and self.page_cache.conditional_headers(course_url):
+                self.rate_limiter.wait()
+                page = self.revalidator.revalidate(course_url)
+            if page is not None:
+                yield page
+                return
+        
+        if self.http_fetcher:
+            self.rate_limiter.wait()
+            page = self.http_fetcher.fetch(course_url)
+            if page is not None:
+                yield page
+                return
+        
+        # Hold the driver until extraction is done, the page reads elements lazily
+        driver = self.driver_pool.acquire()
+        try:
+            page = self.load_page(course_url, driver)
+            if self.page_cache:
+                # Keep the rendered copy so later runs can skip the browser while it is fresh, with the
+                # page's validators so it can be revalidated once it is stale (none if the served HTML
+                # lacks the course content)
+                etag, last_modified = None, None
+                if self.revalidator:
+                    self.rate_limiter.wait()
+                    etag, last_modified = self.revalidator.validators(course_url)
+                self.page_cache.store(page, etag=etag, last_modified=last_modified)
+            yield page
+        finally:
+            self.driver_pool.release(driver)
+    
+    def fetch_snapshot(self, course_url):
+        """Fetch a course page as a detached snapshot that can be parsed after its browser moved on"""
+        with self.open_page(course_url) as page:
+            if isinstance(page, DriverPage):
+                return page.snapshot()
+            return page
+    
+    def extract_program_info(self, course_url):
+        """Load a course page once and extract both the processing and the detail information"""
+        try:
+            print(f"Extracting program info from: {course_url}")
+            with self.open_page(course_url) as page:
+                return self.extract_page(page)
+        except Exception as e:
+            print(f"Error loading course page: {e}")
+            return self.empty_processing_info(course_url), None
+    
+    def extract_page(self, page):
+        """Parse a loaded page, reusing the earlier results when its content did not change"""
+        page_hash = page.content_hash or content_hash(page.html, page.text)
+        
+        extracted = None
+        if self.previous_state:
+            extracted = self.previous_state.unchanged_extraction(page.url, page_hash)
+            if extracted:
+                with self.lock:
+                    self.carried_forward += 1
+        if not extracted and self.page_cache:
+            extracted = self.page_cache.extracted(page)
+        
+        if extracted:
+            processing_info, course_details = extracted
+        else:
+            processing_info = self.parse_processing_info(page)
+            course_details = self.parse_course_details(page)
+            if self.page_cache:
+                self.page_cache.store_extracted(page, processing_info, course_details)
+        
+        self.state.record(page.url, page_hash, processing_info, course_details)
+        return processing_info, course_details
+    
+    def extract_processing_info(self, course_url, driver=None):
         """Extract processing information from course page for immediate saving"""
         try:
             print(f"Extracting processing info from: {course_url}")
-            self.driver.get(course_url)
-            time.sleep(3)
-            
-            # Wait for page to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            processing_info = {}
-            
-            # Get full page text for pattern matching
-            page_text = self.driver.find_element(By.TAG_NAME, "body").text
-            
-            # Extract course name
-            try:
-                course_name_selectors = [
-                    "h1", "h2", ".course-name", ".program-name", 
-                    "[class*='title']", "[class*='name']", ".course-title"
-                ]
-                
-                for selector in course_name_selectors:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        text = element.text.strip()
-                        if text and len(text) > 10:  # Assume course name is longer than 10 chars
-                            processing_info['หลักสูตร'] = text
-                            break
-                    if 'หลักสูตร' in processing_info:
-                        break
-                
-                if 'หลักสูตร' not in processing_info:
-                    processing_info['หลักสูตร'] = "N/A"
-                    
-            except Exception as e:
-                processing_info['หลักสูตร'] = "N/A"
-            
-            # Extract university name
-            try:
-                uni_selectors = [
-                    ".university-name", ".institution-name", 
-                    "[class*='university']", "[class*='institution']",
-                    ".school-name", "[class*='school']"
-                ]
-                
-                for selector in uni_selectors:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        text = element.text.strip()
-                        if text and ('มหาวิทยาลัย' in text or 'university' in text.lower() or 'สถาบัน' in text):
-                            processing_info['มหาวิทยาลัย'] = text
-                            break
-                    if 'มหาวิทยาลัย' in processing_info:
-                        break
-                
-                # Also try to find university name in page text
-                if 'มหาวิทยาลัย' not in processing_info:
-                    uni_pattern = r'([^.\n]*(?:มหาวิทยาลัย|สถาบัน)[^.\n]*)'
-                    matches = re.findall(uni_pattern, page_text)
-                    if matches:
-                        for match in matches:
-                            if len(match.strip()) < 100:  # Reasonable length
-                                processing_info['มหาวิทยาลัย'] = match.strip()
-                                break
-                
-                if 'มหาวิทยาลัย' not in processing_info:
-                    processing_info['มหาวิทยาลัย'] = "N/A"
-                    
-            except Exception as e:
-                processing_info['มหาวิทยาลัย'] = "N/A"
-            
-            # Extract ประเภทหลักสูตร (Course Type)
-            try:
-                course_type_patterns = [
-                    r'ประเภทหลักสูตร[:\s]*([^\n]+)',
-                    r'ประเภท[:\s]*([^\n]+)',
-                    r'(ภาษาไทย|ภาษาอังกฤษ|นานาชาติ|ปกติ|พิเศษ|บางเวลา|เต็มเวลา)',
-                    r'(ปกติ|พิเศษ|นานาชาติ|International|Regular|Special)'
-                ]
-                
-                course_type_found = False
-                for pattern in course_type_patterns:
-                    matches = re.findall(pattern, page_text, re.IGNORECASE)
-                    if matches:
-                        # Get the most relevant match
-                        for match in matches:
-                            if len(match.strip()) < 50:  # Reasonable length
-                                processing_info['ประเภทหลักสูตร'] = match.strip()
-                                course_type_found = True
-                                break
-                        if course_type_found:
-                            break
-                
-                if not course_type_found:
-                    processing_info['ประเภทหลักสูตร'] = "N/A"
-                    
-            except Exception as e:
-                processing_info['ประเภทหลักสูตร'] = "N/A"
-            
-            # Extract ค่าใช้จ่าย (Detailed cost information)
-            try:
-                cost_patterns = [
-                    r'ค่าใช้จ่าย[:\s]*([^\n]+)',
-                    r'อัตราค่าเรียน[:\s]*([^\n]+)',
-                    r'อัตราค่าลำเรียน[:\s]*([^\n]+)',
-                    r'ค่าเทอม[:\s]*([^\n]+)',
-                    r'ค่าธรรมเนียม[:\s]*([^\n]+)',
-                    r'(\d+(?:,\d+)*\s*(?:บาท|บ\.)[^\n]*(?:เทอม|ภาค|ปี|หลักสูตร))',
-                    r'(อัตราค่า[^\n]*\d+(?:,\d+)*[^\n]*บาท)',
-                    r'(ค่าลำเรียน[^\n]*\d+(?:,\d+)*[^\n]*บาท)'
-                ]
-                
-                cost_info = []
-                for pattern in cost_patterns:
-                    matches = re.findall(pattern, page_text, re.IGNORECASE)
-                    if matches:
-                        for match in matches:
-                            if len(match.strip()) < 200:  # Reasonable length
-                                cost_info.append(match.strip())
-                
-                if cost_info:
-                    # Remove duplicates and join
-                    unique_costs = list(set(cost_info))
-                    processing_info['ค่าใช้จ่าย'] = ' | '.join(unique_costs[:3])  # Limit to top 3
-                else:
-                    processing_info['ค่าใช้จ่าย'] = "N/A"
-                    
-            except Exception as e:
-                processing_info['ค่าใช้จ่าย'] = "N/A"
-            
-            # Add URL for reference
-            processing_info['URL'] = course_url
-            
-            return processing_info
-            
+            return self.parse_processing_info(self.load_page(course_url, driver))
         except Exception as e:
             print(f"Error extracting processing info: {e}")
-            return {
-                'หลักสูตร': "N/A",
-                'มหาวิทยาลัย': "N/A",
-                'ประเภทหลักสูตร': "N/A",
-                'ค่าใช้จ่าย': "N/A",
-                'URL': course_url
-            }
+            return self.empty_processing_info(course_url)
     
-    def extract_course_details(self, course_url):
+    def extract_course_details(self, course_url, driver=None):
         """Extract detailed information from course page"""
         try:
             print(f"Extracting details from: {course_url}")
-            self.driver.get(course_url)
-            time.sleep(3)
+            return self.parse_course_details(self.load_page(course_url, driver))
+        except Exception as e:
+            print(f"Error extracting course details: {e}")
+            return None
+    
+    def field_laps(self):
+        """Callable that records the time since its previous call under a field name, a no-op without a field timer"""
+        if self.field_timer is None:
+            return lambda field: None
+        return self.field_timer.laps()
+    
+    def parse_processing_info(self, page):
+        """Build the Processing_Data row from a loaded page"""
+        processing_info = {}
+        lap = self.field_laps()
+        
+        # Extract course name
+        try:
+            for selector in PROCESSING_COURSE_NAME_SELECTORS:
+                for element_text in page.iter_texts(selector):
+                    text = element_text.strip()
+                    if text and len(text) > 10:  # Assume course name is longer than 10 chars
+                        processing_info['หลักสูตร'] = text
+                        break
+                if 'หลักสูตร' in processing_info:
+                    break
             
-            # Wait for page to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+            if 'หลักสูตร' not in processing_info:
+                processing_info['หลักสูตร'] = "N/A"
+                
+        except Exception as e:
+            processing_info['หลักสูตร'] = "N/A"
+        lap('หลักสูตร')
+        
+        # Extract university name
+        try:
+            for selector in PROCESSING_UNIVERSITY_SELECTORS:
+                for element_text in page.iter_texts(selector):
+                    text = element_text.strip()
+                    if text and ('มหาวิทยาลัย' in text or 'university' in text.lower() or 'สถาบัน' in text):
+                        processing_info['มหาวิทยาลัย'] = text
+                        break
+                if 'มหาวิทยาลัย' in processing_info:
+                    break
             
-            course_info = {}
+            # Also try to find university name in page text
+            if 'มหาวิทยาลัย' not in processing_info:
+                matches = page.fields['university'][0]
+                if matches:
+                    for match in matches:
+                        if len(match.strip()) < 100:  # Reasonable length
+                            processing_info['มหาวิทยาลัย'] = match.strip()
+                            break
             
-            # Extract course name
-            try:
-                course_name_selectors = [
-                    "h1", "h2", ".course-name", ".program-name", 
-                    "[class*='title']", "[class*='name']"
-                ]
+            if 'มหาวิทยาลัย' not in processing_info:
+                processing_info['มหาวิทยาลัย'] = "N/A"
                 
-                for selector in course_name_selectors:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        text = element.text.strip()
-                        if text and len(text) > 10:  # Assume course name is longer than 10 chars
-                            course_info['course_name'] = text
+        except Exception as e:
+            processing_info['มหาวิทยาลัย'] = "N/A"
+        lap('มหาวิทยาลัย')
+        
+        # Extract ประเภทหลักสูตร (Course Type)
+        try:
+            # Matches of each course type pattern, in priority order (see extraction.FIELD_PATTERNS)
+            course_type_found = False
+            for matches in page.fields['course_type']:
+                if matches:
+                    # Get the most relevant match
+                    for match in matches:
+                        if len(match.strip()) < 50:  # Reasonable length
+                            processing_info['ประเภทหลักสูตร'] = match.strip()
+                            course_type_found = True
                             break
-                    if 'course_name' in course_info:
+                    if course_type_found:
                         break
+            
+            if not course_type_found:
+                processing_info['ประเภทหลักสูตร'] = "N/A"
                 
-                if 'course_name' not in course_info:
-                    course_info['course_name'] = "N/A"
-                    
-            except Exception as e:
-                course_info['course_name'] = "N/A"
+        except Exception as e:
+            processing_info['ประเภทหลักสูตร'] = "N/A"
+        lap('ประเภทหลักสูตร')
+        
+        # Extract ค่าใช้จ่าย (Detailed cost information)
+        try:
+            cost_info = []
+            for matches in page.fields['cost']:
+                if matches:
+                    for match in matches:
+                        if len(match.strip()) < 200:  # Reasonable length
+                            cost_info.append(match.strip())
             
-            # Extract university name
-            try:
-                uni_selectors = [
-                    ".university-name", ".institution-name", 
-                    "[class*='university']", "[class*='institution']"
-                ]
+            if cost_info:
+                # Remove duplicates (keeping the first-seen order) and join
+                unique_costs = list(dict.fromkeys(cost_info))
+                processing_info['ค่าใช้จ่าย'] = ' | '.join(unique_costs[:3])  # Limit to top 3
+            else:
+                processing_info['ค่าใช้จ่าย'] = "N/A"
                 
-                for selector in uni_selectors:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        text = element.text.strip()
-                        if text and ('มหาวิทยาลัย' in text or 'university' in text.lower()):
-                            course_info['university'] = text
-                            break
-                    if 'university' in course_info:
+        except Exception as e:
+            processing_info['ค่าใช้จ่าย'] = "N/A"
+        lap('ค่าใช้จ่าย')
+        
+        # Add URL for reference
+        processing_info['URL'] = page.url
+        
+        return processing_info
+    
+    def parse_course_details(self, page):
+        """Build the course details used for Main_Data from a loaded page"""
+        course_info = {}
+        lap = self.field_laps()
+        
+        # Extract course name
+        try:
+            for selector in COURSE_NAME_SELECTORS:
+                for element_text in page.iter_texts(selector):
+                    text = element_text.strip()
+                    if text and len(text) > 10:  # Assume course name is longer than 10 chars
+                        course_info['course_name'] = text
                         break
-                
-                if 'university' not in course_info:
-                    course_info['university'] = "N/A"
-                    
-            except Exception as e:
-                course_info['university'] = "N/A"
+                if 'course_name' in course_info:
+                    break
             
-            # Extract tuition fee
-            try:
-                # Get all text content from the page
-                page_text = self.driver.find_element(By.TAG_NAME, "body").text
-                
-                # Look for fee information
-                fee_patterns = [
-                    r'ค่าเทอม[:\s]*(\d+(?:,\d+)*)\s*บาท',
-                    r'ค่าใช้จ่าย[:\s]*(\d+(?:,\d+)*)\s*บาท',
-                    r'อัตราค่าเทอม[:\s]*(\d+(?:,\d+)*)\s*บาท',
-                    r'(\d+(?:,\d+)*)\s*บาท[/\s]*เทอม',
-                    r'(\d+(?:,\d+)*)\s*บาท[/\s]*ปี'
-                ]
+            if 'course_name' not in course_info:
+                course_info['course_name'] = "N/A"
                 
-                fee_found = False
-                for pattern in fee_patterns:
-                    matches = re.findall(pattern, page_text, re.IGNORECASE)
-                    if matches:
-                        course_info['tuition_fee'] = matches[0]
-                        fee_found = True
+        except Exception as e:
+            course_info['course_name'] = "N/A"
+        lap('course_name')
+        
+        # Extract university name
+        try:
+            for selector in UNIVERSITY_SELECTORS:
+                for element_text in page.iter_texts(selector):
+                    text = element_text.strip()
+                    if text and ('มหาวิทยาลัย' in text or 'university' in text.lower()):
+                        course_info['university'] = text
                         break
-                
-                if not fee_found:
-                    course_info['tuition_fee'] = "N/A"
-                    
-            except Exception as e:
-                course_info['tuition_fee'] = "N/A"
+                if 'university' in course_info:
+                    break
             
-            return course_info
+            if 'university' not in course_info:
+                course_info['university'] = "N/A"
+                
+        except Exception as e:
+            course_info['university'] = "N/A"
+        lap('university')
+        
+        # Extract tuition fee
+        try:
+            # Look for fee information, the page text was scanned for every pattern at once
+            fee_found = False
+            for matches in page.fields['tuition_fee']:
+                if matches:
+                    course_info['tuition_fee'] = matches[0]
+                    fee_found = True
+                    break
             
+            if not fee_found:
+                course_info['tuition_fee'] = "N/A"
+                
         except Exception as e:
-            print(f"Error extracting course details: {e}")
-            return None
+            course_info['tuition_fee'] = "N/A"
+        lap('tuition_fee')
+        
+        return course_info
     
     def parse_tuition_fee(self, fee_text, page_context=""):
         """Parse tuition fee text and convert to per-semester amount"""
@@ -344,21 +476,106 @@ class TCASEngineeringScraper:
         
         try:
             # Remove commas and extract numbers
-            amount = int(fee_text.replace(',', ''))
+            amount = to_amount(fee_text)
             
-            # Determine if it's per year or per semester based on context
+            # Determine if it's per year or per semester based on context, same rules as tuition.normalize_tuition
             if 'ปี' in page_context or 'year' in page_context.lower():
-                amount = amount / 2  # Convert yearly to semester
+                fee_type = 'per_year'
             elif 'หลักสูตร' in page_context or 'program' in page_context.lower():
-                amount = amount / 8  # Assume 4 years = 8 semesters
-            # If no context, assume it's per semester
+                fee_type = 'lumpsum'  # Whole 4-year program
+            else:
+                fee_type = 'per_term'  # If no context, assume it's per semester
             
-            return int(amount)
+            return int(per_semester(amount, fee_type))
         
         except Exception as e:
             print(f"Error parsing fee: {fee_text} - {e}")
             return None
     
+    def process_program(self, i, result, total):
+        """Extract both processing and main data for a single search result"""
+        if self.journal and result['url'] in self.journal.completed:
+            print(f"\n[{i}/{total}] Restored from checkpoint: {result['title']}")
+            # Keep the page in the state as if it was extracted now, the next incremental run can skip it
+            page_hash, extracted = self.journal.restored_page(result['url'])
+            if extracted:
+                self.state.record(result['url'], page_hash, *extracted)
+            return self.journal.restored(result['url'], i)
+        
+        print(f"\n[{i}/{total}] Processing: {result['title']}")
+        
+        # Load the page once and extract both the processing and the detailed information
+        processing_info, course_details = self.extract_program_info(result['url'])
+        processing_info, program_data = self.build_rows(i, result, processing_info, course_details)
+        
+        if self.journal:
+            # extract_page() recorded the page's hash and extraction in the state
+            entry = self.state.entries.get(result['url'], {})
+            self.journal.add_program(result['url'], processing_info, program_data,
+                                     entry.get('hash'), entry.get('extracted'))
+        return processing_info, program_data
+    
+    def build_rows(self, i, result, processing_info, course_details):
+        """Turn the extracted page information into the Processing_Data and Main_Data rows"""
+        processing_info['ลำดับ'] = i
+        processing_info['คำค้นหา'] = result['keyword']
+        processing_info['ข้อมูลเริ่มต้น'] = result['title']
+        
+        # Display the processing info
+        print(f"มหาวิทยาลัย: {processing_info['มหาวิทยาลัย']}")
+        print(f"หลักสูตร: {processing_info['หลักสูตร']}")
+        print(f"ประเภทหลักสูตร: {processing_info['ประเภทหลักสูตร']}")
+        print(f"ค่าใช้จ่าย: {processing_info['ค่าใช้จ่าย']}")
+        print("-" * 50)
+        
+        program_data = None
+        
+        if course_details:
+            # Parse tuition fee
+            lap = self.field_laps()
+            semester_fee = self.parse_tuition_fee(course_details['tuition_fee'])
+            lap('ค่าเทอม_บาท')
+            
+            # Only include programs with valid fee <= 200,000
+            if semester_fee and semester_fee <= MAX_SEMESTER_FEE:
+                program_data = {
+                    'มหาวิทยาลัย': course_details['university'],
+                    'หลักสูตร': course_details['course_name'],
+                    'ค่าเทอม_บาท': semester_fee,
+                    'ค่าเทอม_ข้อมูลต้นฉบับ': course_details['tuition_fee'],
+                    'URL': result['url'],
+                    'คำค้นหา': result['keyword']
+                }
+                print(f"✓ Added: {course_details['university']} - {semester_fee:,} บาท/เทอม")
+            
+            elif semester_fee and semester_fee > MAX_SEMESTER_FEE:
+                print(f"✗ Excluded (too expensive): {course_details['university']} - {semester_fee:,} บาท/เทอม")
+            
+            else:
+                print(f"✗ Excluded (no fee info): {course_details['university']}")
+        
+        else:
+            print(f"✗ Failed to extract details")
+        
+        return processing_info, program_data
+    
+    def process_programs_parallel(self, search_results):
+        """Process search results with a pool of workers, each borrowing a browser only when it needs one"""
+        print(f"Running with {self.workers} workers")
+        total = len(search_results)
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # map() yields in submission order, so results stay ordered by ลำดับ
+            return list(executor.map(lambda item: self.process_program(item[0], item[1], total),
+                                     enumerate(search_results, 1)))
+    
+    def add_result(self, processing_info, program_data):
+        """Merge a processed program into the collected data"""
+        self.processing_data.append(processing_info)
+        if program_data:
+            self.data.append(program_data)
+        self.state.add_rows(processing_info, program_data)
+    
     def scrape_engineering_programs(self):
         """Main scraping function"""
         # Keywords to search for
@@ -369,8 +586,14 @@ class TCASEngineeringScraper:
         
         print("=== Starting TCAS Engineering Programs Scraper ===")
         
-        # Search for programs
-        search_results = self.search_engineering_programs(keywords)
+        # Search for programs, a resumed crawl keeps the URL queue it checkpointed
+        if self.journal and self.journal.search_results is not None:
+            search_results = self.journal.search_results
+            print(f"Using {len(search_results)} search results from checkpoint")
+        else:
+            search_results = self.search_engineering_programs(keywords)
+            if self.journal and search_results:
+                self.journal.add_search(search_results)
         
         if not search_results:
             print("No programs found")
@@ -379,62 +602,41 @@ class TCASEngineeringScraper:
         print(f"\n=== Processing {len(search_results)} programs ===")
         
         # Extract details for each program
-        for i, result in enumerate(search_results, 1):
-            print(f"\n[{i}/{len(search_results)}] Processing: {result['title']}")
-            
-            # Extract processing information first
-            processing_info = self.extract_processing_info(result['url'])
-            processing_info['ลำดับ'] = i
-            processing_info['คำค้นหา'] = result['keyword']
-            processing_info['ข้อมูลเริ่มต้น'] = result['title']
-            
-            # Add to processing data
-            self.processing_data.append(processing_info)
-            
-            # Display the processing info
-            print(f"มหาวิทยาลัย: {processing_info['มหาวิทยาลัย']}")
-            print(f"หลักสูตร: {processing_info['หลักสูตร']}")
-            print(f"ประเภทหลักสูตร: {processing_info['ประเภทหลักสูตร']}")
-            print(f"ค่าใช้จ่าย: {processing_info['ค่าใช้จ่าย']}")
-            print("-" * 50)
-            
-            # Extract detailed course information
-            course_details = self.extract_course_details(result['url'])
-            
-            if course_details:
-                # Parse tuition fee
-                semester_fee = self.parse_tuition_fee(course_details['tuition_fee'])
-                
-                # Only include programs with valid fee <= 200,000
-                if semester_fee and semester_fee <= 200000:
-                    program_data = {
-                        'มหาวิทยาลัย': course_details['university'],
-                        'หลักสูตร': course_details['course_name'],
-                        'ค่าเทอม_บาท': semester_fee,
-                        'ค่าเทอม_ข้อมูลต้นฉบับ': course_details['tuition_fee'],
-                        'URL': result['url'],
-                        'คำค้นหา': result['keyword']
-                    }
-                    
-                    self.data.append(program_data)
-                    print(f"✓ Added: {course_details['university']} - {semester_fee:,} บาท/เทอม")
-                
-                elif semester_fee and semester_fee > 200000:
-                    print(f"✗ Excluded (too expensive): {course_details['university']} - {semester_fee:,} บาท/เทอม")
-                
-                else:
-                    print(f"✗ Excluded (no fee info): {course_details['university']}")
-            
-            else:
-                print(f"✗ Failed to extract details")
-            
-            time.sleep(1)  # Be respectful to the server
+        if self.workers > 1:
+            results = self.process_programs_parallel(search_results)
+            for processing_info, program_data in sorted(results, key=lambda r: r[0]['ลำดับ']):
+                self.add_result(processing_info, program_data)
+        else:
+            for i, result in enumerate(search_results, 1):
+                self.add_result(*self.process_program(i, result, len(search_results)))
         
         print(f"\n=== Scraping completed ===")
         print(f"Successfully scraped {len(self.data)} programs")
         print(f"Processing data collected for {len(self.processing_data)} programs")
+        self.waiter.print_stats()
+        if self.http_fetcher:
+            self.http_fetcher.print_stats()
+        if self.page_cache:
+            self.page_cache.save()
+            self.page_cache.print_stats()
+        if self.previous_state:
+            self.report_changes()
         return self.data
     
+    def report_changes(self):
+        """Diff this run against the previous one and print the changelog"""
+        self.changelog = self.state.changelog(self.previous_state)
+        counts = {}
+        for change in self.changelog:
+            counts[change['การเปลี่ยนแปลง']] = counts.get(change['การเปลี่ยนแปลง'], 0) + 1
+        
+        print(f"\n=== Changes since previous run ===")
+        print(f"Unchanged pages carried forward: {self.carried_forward}")
+        print(f"Added: {counts.get('added', 0)}, removed: {counts.get('removed', 0)}, "
+              f"fee changed: {counts.get('fee_changed', 0)}")
+        for change in self.changelog:
+            print(f"[{change['การเปลี่ยนแปลง']}] {change['มหาวิทยาลัย']} - {change['หลักสูตร']}")
+    
     def save_to_excel(self, filename="tcas_engineering_programs.xlsx"):
         """Save scraped data to Excel file with multiple sheets"""
         if not self.data and not self.processing_data:
@@ -466,6 +668,11 @@ class TCASEngineeringScraper:
                     processing_df.to_excel(writer, sheet_name='Processing_Data', index=False)
                     print(f"Processing data saved: {len(processing_df)} records")
 
+                # Save what changed since the previous run (incremental mode)
+                if self.changelog:
+                    pd.DataFrame(self.changelog).to_excel(writer, sheet_name='Changelog', index=False)
+                    print(f"Changelog saved: {len(self.changelog)} changes")
+
                 # Save main data
                 if self.data:
                     df = pd.DataFrame(self.data)
@@ -493,16 +700,67 @@ class TCASEngineeringScraper:
     
     def close(self):
         """Close the webdriver"""
+        if self.http_fetcher:
+            self.http_fetcher.close()
+        if self.revalidator:
+            self.revalidator.close()
+        self.driver_pool.close()
         if self.driver:
             self.driver.quit()
             print("Browser closed")
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Scrape engineering programs from course.mytcas.com")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of browser workers processing course pages in parallel")
+    parser.add_argument("--rate-limit", type=float, default=1.0,
+                        help="maximum page loads per second across all workers (0 = unlimited)")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium",
+                        help="fetch course pages with Chrome, or over plain HTTP with Chrome as fallback "
+                             "(the keyword search always runs in Chrome)")
+    parser.add_argument("--dom-mode", choices=DOM_MODES, default="script",
+                        help="read course/university name elements one WebDriver call each (live), "
+                             "all in one script call (script), or from one parsed page_source (source)")
+    parser.add_argument("--cache-dir", default=".page_cache", help="directory of the on-disk page cache")
+    parser.add_argument("--no-cache", action="store_true", help="always download every course page")
+    parser.add_argument("--cache-ttl", type=float, default=6,
+                        help="hours a cached page is used without asking the server whether it changed")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only extract new or changed programs, carry the rest forward from the previous run. "
+                             "Pages are only fetched again when their page cache entry is stale and the server "
+                             "reports a change, with --no-cache every page is fetched")
+    checkpoint = parser.add_mutually_exclusive_group()
+    checkpoint.add_argument("--resume", action="store_true",
+                            help="continue an interrupted crawl from its checkpoint journal")
+    checkpoint.add_argument("--fresh", action="store_true",
+                            help="start over although an interrupted crawl left a checkpoint journal "
+                                 "(it is kept as *.journal.jsonl.old)")
+    parser.add_argument("--output", default="tcas_engineering_programs.xlsx", help="Excel file to write")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function to run the scraper"""
-    scraper = TCASEngineeringScraper()
+    args = parse_args(argv)
+    state_file = state_filename(args.output)
+    journal_file = journal_filename(args.output)
+    # Never overwrite the checkpoint of an interrupted crawl without being told to
+    if not args.resume and not args.fresh and CrawlJournal.has_checkpoint(journal_file):
+        print(f"{journal_file} holds the checkpoint of an interrupted crawl: "
+              f"run again with --resume to continue it, or --fresh to start over")
+        return
+    previous_state = CrawlState.load(state_file, excel_file=args.output) if args.incremental else None
+    journal = CrawlJournal(journal_file, resume=args.resume)
+    scraper = TCASEngineeringScraper(workers=args.workers, rate_limit=args.rate_limit,
+                                     backend=args.backend, dom_mode=args.dom_mode,
+                                     cache_dir=None if args.no_cache else args.cache_dir,
+                                     cache_ttl=args.cache_ttl * 3600,
+                                     previous_state=previous_state,
+                                     journal=journal)
     
     if not scraper.driver:
         print("Failed to initialize driver. Please check ChromeDriver installation.")
+        journal.close()
         return
     
     try:
@@ -510,7 +768,15 @@ def main():
         data = scraper.scrape_engineering_programs()
         
         # Save to Excel (will save both processing and main data)
-        df = scraper.save_to_excel()
+        df = scraper.save_to_excel(args.output)
+        
+        # Keep URL -> content hash -> rows for the next incremental run
+        if scraper.processing_data:
+            scraper.state.save(state_file)
+        
+        # The crawl is safely on disk, the checkpoint is no longer needed
+        if df is not None:
+            journal.discard()
         
         if df is not None and len(df) > 0:
             print("\n=== Sample of collected data ===")
@@ -524,6 +790,7 @@ def main():
         traceback.print_exc()
     
     finally:
+        journal.close()
         scraper.close()
 
 if __name__ == "__main__":
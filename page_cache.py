@@ -0,0 +1,198 @@
+import copy
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pages import HtmlPage
+
+
+def page_content(html, text):
+    """Serialized page content, the unit the cache stores and hashes"""
+    return json.dumps({'html': html, 'text': text}, ensure_ascii=False).encode('utf-8')
+
+
+def content_hash(html, text):
+    """sha256 of a page's content, the same value the cache files it under"""
+    return hashlib.sha256(page_content(html, text)).hexdigest()
+
+
+class PageCache:
+    """Persistent content-addressed cache of course pages keyed by URL"""
+    def __init__(self, directory=".page_cache", ttl=6 * 3600, max_bytes=200 * 1024 * 1024,
+                 max_age=30 * 24 * 3600):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.index_file = os.path.join(directory, "index.json")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'unchanged': 0,
+                      'extraction_reused': 0, 'bytes_saved': 0}
+        
+        os.makedirs(self.objects_dir, exist_ok=True)
+        try:
+            with open(self.index_file, encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+    
+    def object_path(self, content_hash):
+        return os.path.join(self.objects_dir, f"{content_hash}.json.gz")
+    
+    def entry(self, url):
+        """Index entry for a URL, or None"""
+        with self.lock:
+            return self.index.get(url)
+    
+    def page_from_entry(self, url, entry):
+        """Rebuild the cached page, or None if its object is gone"""
+        try:
+            with gzip.open(self.object_path(entry['hash']), 'rt', encoding='utf-8') as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        page = HtmlPage(url, content['html'], text=content['text'])
+        page.content_hash = entry['hash']
+        page.unchanged = True
+        with self.lock:
+            entry['accessed_at'] = time.time()
+        return page
+    
+    def get_fresh(self, url):
+        """Cached page if it is still within the TTL, served without touching the network"""
+        entry = self.entry(url)
+        if not entry or time.time() - entry['fetched_at'] > self.ttl:
+            return None
+        
+        page = self.page_from_entry(url, entry)
+        if page is not None:
+            self.count('hits', entry['bytes'])
+        return page
+    
+    def revalidated(self, url):
+        """Server answered 304 Not Modified, serve the cached copy and restart its TTL"""
+        entry = self.entry(url)
+        page = self.page_from_entry(url, entry) if entry else None
+        if page is not None:
+            with self.lock:
+                entry['fetched_at'] = time.time()
+            self.count('revalidated', entry['bytes'])
+        return page
+    
+    def conditional_headers(self, url):
+        """If-None-Match/If-Modified-Since headers for revalidating a cached page"""
+        entry = self.entry(url)
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def store(self, page, etag=None, last_modified=None):
+        """Cache a freshly downloaded page and tag it with its content hash"""
+        content = page_content(page.html, page.text)
+        page_hash = hashlib.sha256(content).hexdigest()
+        path = self.object_path(page_hash)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        
+        now = time.time()
+        with self.lock:
+            previous = self.index.get(page.url)
+            unchanged = previous is not None and previous['hash'] == page_hash
+            entry = {
+                'hash': page_hash,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': now,
+                'accessed_at': now,
+                'size': os.path.getsize(path),
+                'bytes': len(content)
+            }
+            # Extraction results stay valid as long as the content did not change
+            if unchanged and 'extracted' in previous:
+                entry['extracted'] = previous['extracted']
+            self.index[page.url] = entry
+        
+        self.count('unchanged' if unchanged else 'misses')
+        page.content_hash = page_hash
+        page.unchanged = unchanged
+        return page
+    
+    def extracted(self, page):
+        """Extraction results saved for this exact page content, or None"""
+        entry = self.entry(page.url)
+        if not entry or not page.content_hash or entry['hash'] != page.content_hash or 'extracted' not in entry:
+            return None
+        self.count('extraction_reused')
+        return copy.deepcopy(entry['extracted'])
+    
+    def store_extracted(self, page, processing_info, course_details):
+        """Remember extraction results for the page's content hash"""
+        with self.lock:
+            entry = self.index.get(page.url)
+            if entry and entry['hash'] == page.content_hash:
+                entry['extracted'] = copy.deepcopy([processing_info, course_details])
+    
+    def count(self, key, bytes_saved=0):
+        with self.lock:
+            self.stats[key] += 1
+            self.stats['bytes_saved'] += bytes_saved
+    
+    def evict(self):
+        """Drop entries unused for max_age, then least recently used ones until the cache fits max_bytes"""
+        now = time.time()
+        with self.lock:
+            for url, entry in list(self.index.items()):
+                if now - entry['accessed_at'] > self.max_age:
+                    del self.index[url]
+            
+            # Several URLs can share one object, it only frees space when the last of them goes
+            references = {}
+            sizes = {}
+            for entry in self.index.values():
+                references[entry['hash']] = references.get(entry['hash'], 0) + 1
+                sizes[entry['hash']] = entry['size']
+            total = sum(sizes.values())
+            
+            for url, entry in sorted(self.index.items(), key=lambda item: item[1]['accessed_at']):
+                if total <= self.max_bytes:
+                    break
+                del self.index[url]
+                references[entry['hash']] -= 1
+                if not references[entry['hash']]:
+                    total -= sizes[entry['hash']]
+            
+            referenced = {f"{entry['hash']}.json.gz" for entry in self.index.values()}
+        
+        # Remove objects no URL points to anymore
+        for name in os.listdir(self.objects_dir):
+            if name.endswith('.json.gz') and name not in referenced:
+                os.remove(os.path.join(self.objects_dir, name))
+    
+    def save(self):
+        """Evict and write the index atomically"""
+        self.evict()
+        with self.lock:
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False)
+            os.replace(tmp_file, self.index_file)
+    
+    def print_stats(self):
+        """Print hit rate and bytes saved"""
+        stats = self.stats
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses'] + stats['unchanged']
+        hit_rate = (stats['hits'] + stats['revalidated']) / lookups if lookups else 0
+        print(f"Page cache: {stats['hits']} fresh hits, {stats['revalidated']} revalidated (304), "
+              f"{stats['misses'] + stats['unchanged']} downloaded ({stats['unchanged']} unchanged)")
+        print(f"Cache hit rate: {hit_rate:.1%}, bytes saved: {stats['bytes_saved'] / 1024:,.1f} KB, "
+              f"extractions reused: {stats['extraction_reused']}")
@@ -0,0 +1,333 @@
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from extraction import extract_fields
+
+# Text that only shows up once a course page has rendered its content
+COURSE_READY_MARKERS = ('หลักสูตร', 'มหาวิทยาลัย')
+
+# Seconds the search result list must keep its length before it counts as fully rendered
+RESULTS_SETTLE_SECONDS = 0.5
+
+# Tags rendered on their own lines, the way a browser lays out body.text
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'
+}
+# Tags whose content never shows up in the rendered text
+HIDDEN_TAGS = {'head', 'script', 'style', 'noscript', 'template', 'title'}
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr'
+}
+
+# How DriverPage reads element texts: one WebDriver call per element (live), every selector in one
+# execute_script call (script), or a local parse of one page_source snapshot (source)
+DOM_MODES = ('live', 'script', 'source')
+
+# Text of every element matching each selector in one round trip. Elements that are not rendered
+# give '' like Selenium's element.text
+SELECTOR_TEXTS_SCRIPT = """
+return arguments[0].map(function (selector) {
+    return Array.prototype.map.call(document.querySelectorAll(selector), function (element) {
+        return element.getClientRects().length ? element.innerText : '';
+    });
+});
+"""
+
+
+class DriverPage:
+    """Snapshot of a loaded course page shared by every extraction step"""
+    def __init__(self, driver, url, dom_mode="live", selectors=()):
+        self.driver = driver
+        self.url = url
+        self.dom_mode = dom_mode
+        # Selectors the parsers will ask for, fetched together with the first one in script mode
+        self.selectors = selectors
+        # Read the body text once, all regex extraction runs on this copy
+        self.text = driver.find_element(By.TAG_NAME, "body").text
+        self.content_hash = None  # Set by the page cache
+        self.unchanged = False
+        self._html = None
+        self._fields = None
+        self._local_page = None
+        self._elements = {}
+        self._texts = {}
+    
+    @property
+    def html(self):
+        """Rendered DOM source, read from the driver on first use"""
+        if self._html is None:
+            self._html = self.driver.page_source
+        return self._html
+    
+    @property
+    def fields(self):
+        """Regex field matches of the page text, all patterns scanned in one pass on first use"""
+        if self._fields is None:
+            self._fields = extract_fields(self.text)
+        return self._fields
+    
+    def local_page(self):
+        """The page_source snapshot parsed locally, built on first use"""
+        if self._local_page is None:
+            self._local_page = HtmlPage(self.url, self.html, text=self.text)
+        return self._local_page
+    
+    def query_texts(self, selector):
+        """Read the texts of this selector and every other known one with a single script call"""
+        selectors = [selector] + [other for other in self.selectors if other not in self._texts and other != selector]
+        texts = self.driver.execute_script(SELECTOR_TEXTS_SCRIPT, selectors) or [[] for _ in selectors]
+        for other, other_texts in zip(selectors, texts):
+            self._texts[other] = other_texts
+    
+    def iter_texts(self, selector):
+        """Yield the text of each element matching a CSS selector, reading each element only once"""
+        if self.dom_mode == 'source':
+            yield from self.local_page().iter_texts(selector)
+            return
+        if self.dom_mode == 'script':
+            if selector not in self._texts:
+                self.query_texts(selector)
+            yield from self._texts[selector]
+            return
+        
+        elements = self._elements.get(selector)
+        if elements is None:
+            elements = self._elements[selector] = self.driver.find_elements(By.CSS_SELECTOR, selector)
+        
+        texts = self._texts.setdefault(selector, [])
+        for index, element in enumerate(elements):
+            if index == len(texts):
+                texts.append(element.text)
+            yield texts[index]
+    
+    def snapshot(self):
+        """Copy the rendered DOM into an HtmlPage so the driver can be released"""
+        page = self.local_page()
+        page.content_hash = self.content_hash
+        page.unchanged = self.unchanged
+        return page
+
+
+class HtmlNode:
+    """Element of a locally parsed HTML document"""
+    def __init__(self, tag, attrs):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self._text = None
+    
+    @property
+    def text(self):
+        """Rendered text of the element, laid out like Selenium's element.text"""
+        if self._text is None:
+            chunks = []
+            render_text(self, chunks)
+            lines = (line.strip() for line in ''.join(chunks).split('\n'))
+            self._text = '\n'.join(line for line in lines if line)
+        return self._text
+
+
+def render_text(node, chunks):
+    """Append the visible text of a node, with a line break around block elements"""
+    if node.tag in HIDDEN_TAGS:
+        return
+    block = node.tag in BLOCK_TAGS
+    if block:
+        chunks.append('\n')
+    for child in node.children:
+        if isinstance(child, str):
+            chunks.append(re.sub(r'\s+', ' ', child))
+        elif child.tag == 'br':
+            chunks.append('\n')
+        else:
+            render_text(child, chunks)
+            if child.tag in ('td', 'th'):
+                chunks.append(' ')
+    if block:
+        chunks.append('\n')
+
+
+class TreeBuilder(HTMLParser):
+    """Lenient HTML parser building an HtmlNode tree"""
+    def __init__(self):
+        super().__init__()
+        self.root = HtmlNode('#document', {})
+        self.stack = [self.root]
+        self.elements = []
+    
+    def handle_starttag(self, tag, attrs):
+        node = HtmlNode(tag, {name: value or '' for name, value in attrs})
+        self.stack[-1].children.append(node)
+        self.elements.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+    
+    def handle_startendtag(self, tag, attrs):
+        node = HtmlNode(tag, {name: value or '' for name, value in attrs})
+        self.stack[-1].children.append(node)
+        self.elements.append(node)
+    
+    def handle_endtag(self, tag):
+        # Close the nearest open element with this tag, implicitly closing anything left open inside it
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                break
+    
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def selector_matcher(selector):
+    """Build a predicate for the simple CSS selectors used by the scraper (tag, .class, [attr*='value'])"""
+    selector = selector.strip()
+    
+    match = re.fullmatch(r"\[([\w-]+)\*=['\"]?([^'\"\]]*)['\"]?\]", selector)
+    if match:
+        name, value = match.groups()
+        return lambda node: value in node.attrs.get(name, '')
+    
+    match = re.fullmatch(r"\.([\w-]+)", selector)
+    if match:
+        class_name = match.group(1)
+        return lambda node: class_name in node.attrs.get('class', '').split()
+    
+    if re.fullmatch(r"[a-zA-Z][\w-]*", selector):
+        tag = selector.lower()
+        return lambda node: node.tag == tag
+    
+    raise ValueError(f"Unsupported selector: {selector}")
+
+
+class HtmlPage:
+    """Course page parsed locally from its HTML, with the same interface as DriverPage"""
+    def __init__(self, url, html, text=None):
+        self.url = url
+        self.html = html
+        self.content_hash = None  # Set by the page cache
+        self.unchanged = False
+        builder = TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        self.elements = builder.elements
+        
+        if text is None:
+            body = next((node for node in self.elements if node.tag == 'body'), builder.root)
+            text = body.text
+        self.text = text
+        self._fields = None
+    
+    @property
+    def fields(self):
+        """Regex field matches of the page text, all patterns scanned in one pass on first use"""
+        if self._fields is None:
+            self._fields = extract_fields(self.text)
+        return self._fields
+    
+    def iter_texts(self, selector):
+        """Yield the text of each element matching a CSS selector, in document order"""
+        matchers = [selector_matcher(part) for part in selector.split(',')]
+        for node in self.elements:
+            if any(matcher(node) for matcher in matchers):
+                yield node.text
+
+
+def course_text_ready(text):
+    """Page text contains rendered course content"""
+    return any(marker in text for marker in COURSE_READY_MARKERS)
+
+
+def course_page_ready(driver):
+    """Course body has finished loading and rendered its content"""
+    if driver.execute_script("return document.readyState") != "complete":
+        return False
+    return course_text_ready(driver.find_element(By.TAG_NAME, "body").text)
+
+
+def search_results_ready(selector, previous=(), settle=RESULTS_SETTLE_SECONDS):
+    """Result list replaced the links found before the search (previous) and kept the same length for
+    settle seconds, a list rendered in steps can pause between them"""
+    previous = list(previous)
+    state = {'replaced': not previous, 'count': -1, 'since': 0.0}
+    
+    def condition(driver):
+        links = driver.find_elements(By.CSS_SELECTOR, selector)
+        if not state['replaced']:
+            # The same elements are still there (element ids compare equal), the search did not render yet
+            if links == previous:
+                return False
+            state['replaced'] = True
+        now = time.monotonic()
+        if len(links) != state['count']:
+            state['count'], state['since'] = len(links), now
+            return False
+        return len(links) > 0 and now - state['since'] >= settle
+    
+    return condition
+
+
+class PageWaiter:
+    """Wait for page readiness conditions instead of fixed sleeps and keep latency stats per phase"""
+    DEFAULT_TIMEOUTS = {
+        'search_page': 10,
+        'search_results': 10,
+        'course_page': 10
+    }
+    
+    def __init__(self, timeouts=None, poll_frequency=0.05):
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.poll_frequency = poll_frequency
+        self.latencies = {}
+        self.timeout_counts = {}
+        self.lock = threading.Lock()
+    
+    def wait(self, driver, phase, condition, required=False):
+        """Return as soon as condition(driver) is truthy; on timeout raise if required, else return None"""
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(driver, self.timeouts[phase], poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            self.record(phase, time.monotonic() - start, timed_out=True)
+            if required:
+                raise
+            return None
+        
+        self.record(phase, time.monotonic() - start)
+        return result
+    
+    def record(self, phase, seconds, timed_out=False):
+        """Store the latency of one wait"""
+        with self.lock:
+            self.latencies.setdefault(phase, []).append(seconds)
+            if timed_out:
+                self.timeout_counts[phase] = self.timeout_counts.get(phase, 0) + 1
+    
+    def stats(self):
+        """Latency summary per phase in seconds"""
+        with self.lock:
+            summary = {}
+            for phase, values in self.latencies.items():
+                ordered = sorted(values)
+                summary[phase] = {
+                    'count': len(ordered),
+                    'mean': sum(ordered) / len(ordered),
+                    'p50': ordered[len(ordered) // 2],
+                    'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    'max': ordered[-1],
+                    'timeouts': self.timeout_counts.get(phase, 0)
+                }
+            return summary
+    
+    def print_stats(self):
+        """Print the latency summary"""
+        for phase, stat in self.stats().items():
+            print(f"{phase}: {stat['count']} waits, mean {stat['mean'] * 1000:,.0f} ms, "
+                  f"p50 {stat['p50'] * 1000:,.0f} ms, p95 {stat['p95'] * 1000:,.0f} ms, "
+                  f"max {stat['max'] * 1000:,.0f} ms, timeouts {stat['timeouts']}")
@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tuition import normalize_tuition
+from information import TCASEngineeringScraper, ENGINEERING_WORDS
+from async_crawler import AsyncTCASCrawler, JsonlSink, read_keywords
+from data_store import EXCEL_FILE
+
+# The scraper stores the page heading "ข้อมูลการรับสมัครของ<university>" as มหาวิทยาลัย
+UNIVERSITY_PREFIX = 'ข้อมูลการรับสมัครของ'
+
+# Columns of the dataset the dashboard reads, the same ones the cleaning notebook used to export
+DASHBOARD_SCHEMA = pa.schema([
+    ('หลักสูตร', pa.string()),
+    ('ประเภทหลักสูตร', pa.string()),
+    ('URL', pa.string()),
+    ('คำค้นหา', pa.string()),
+    ('ค่าเทอมต่อเทอม_ประมาณ', pa.float64()),
+    ('ชื่อมหาวิทยาลัย', pa.string())
+])
+
+
+def dashboard_rows(processing):
+    """Processing_Data rows as dashboard rows: university name and estimated per-semester fee"""
+    rows = processing.astype({'มหาวิทยาลัย': object, 'ประเภทหลักสูตร': object})
+    university = rows['มหาวิทยาลัย'].where(rows['มหาวิทยาลัย'] != "N/A")
+    return pd.DataFrame({
+        'หลักสูตร': rows['หลักสูตร'],
+        'ประเภทหลักสูตร': rows['ประเภทหลักสูตร'].where(rows['ประเภทหลักสูตร'] != "N/A"),
+        'URL': rows['URL'],
+        'คำค้นหา': rows['คำค้นหา'],
+        'ค่าเทอมต่อเทอม_ประมาณ': normalize_tuition(rows['ค่าใช้จ่าย'])['ค่าเทอมต่อเทอม_ประมาณ'],
+        'ชื่อมหาวิทยาลัย': university.str.replace(UNIVERSITY_PREFIX, '', regex=False).str.strip()
+    }, index=rows.index)
+
+
+class ParquetSink:
+    """Clean rows in batches as they are scraped and append them to the dashboard's Parquet file"""
+    def __init__(self, filename="final_data.parquet", batch_size=64, excel=None):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.excel = excel
+        self.batch = []
+        # Cleaned batches, only kept when an Excel copy is wanted
+        self.frames = []
+        self.rows = 0
+        # Write next to the target and swap it in on close, the dashboard never reads a half-written file
+        self.tmp_file = f"{filename}.tmp"
+        self.writer = pq.ParquetWriter(self.tmp_file, DASHBOARD_SCHEMA)
+    
+    def write(self, processing_info, program_data=None):
+        self.batch.append(processing_info)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Clean the buffered rows and write them as one row group"""
+        if not self.batch:
+            return
+        frame = dashboard_rows(pd.DataFrame(self.batch))
+        self.writer.write_table(pa.Table.from_pandas(frame, schema=DASHBOARD_SCHEMA, preserve_index=False))
+        if self.excel:
+            self.frames.append(frame)
+        self.rows += len(frame)
+        self.batch = []
+    
+    def close(self):
+        """Publish the rows of a finished run"""
+        self.flush()
+        self.writer.close()
+        if self.excel:
+            frames = self.frames or [pd.DataFrame(columns=DASHBOARD_SCHEMA.names)]
+            pd.concat(frames, ignore_index=True).to_excel(self.excel, index=False)
+            print(f"Saved Excel copy to {self.excel}")
+        os.replace(self.tmp_file, self.filename)
+        # Newer than the Excel copy, or the dashboard would take the snapshot as stale and rebuild it from Excel
+        os.utime(self.filename)
+        print(f"Saved {self.rows} rows to {self.filename}")
+    
+    def abort(self):
+        """Drop the rows of a failed or interrupted run, the dashboard keeps the previous snapshot"""
+        self.writer.close()
+        os.remove(self.tmp_file)
+        print(f"Run did not finish, {self.filename} left unchanged")
+
+
+def excel_rows(filename):
+    """Processing_Data rows of a workbook written by the scraper"""
+    sheet = pd.read_excel(filename, sheet_name="Processing_Data")
+    yield from sheet.to_dict('records')
+
+
+def jsonl_rows(filename):
+    """Processing rows of a JSON Lines stream written by async_crawler.py"""
+    with open(filename, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)['processing']
+
+
+def make_sinks(args):
+    """Parquet output plus the optional JSON Lines stream of the raw rows"""
+    sinks = [ParquetSink(args.output, batch_size=args.batch_size, excel=args.excel)]
+    if args.stream:
+        sinks.append(JsonlSink(args.stream))
+    return sinks
+
+
+def convert(args):
+    """Stream the rows of an earlier scrape through the cleaning step"""
+    rows = excel_rows(args.from_excel) if args.from_excel else jsonl_rows(args.from_jsonl)
+    sinks = make_sinks(args)
+    try:
+        for row in rows:
+            for sink in sinks:
+                sink.write(row, None)
+    except BaseException:
+        for sink in sinks:
+            sink.abort()
+        raise
+    for sink in sinks:
+        sink.close()
+
+
+def crawl(args):
+    """Scrape course.mytcas.com, every extracted row goes straight to the sinks"""
+    scraper = TCASEngineeringScraper(workers=args.fetch_concurrency, rate_limit=args.rate_limit,
+                                     backend=args.backend,
+                                     cache_dir=None if args.no_cache else args.cache_dir)
+    if not scraper.driver:
+        print("Failed to initialize driver. Please check ChromeDriver installation.")
+        return
+    
+    # The crawler closes the sinks when it finishes, or aborts them when it fails
+    crawler = AsyncTCASCrawler(scraper, make_sinks(args), fetch_concurrency=args.fetch_concurrency,
+                               title_words=None if args.all_programs else ENGINEERING_WORDS)
+    try:
+        asyncio.run(crawler.run(read_keywords(args)))
+    finally:
+        scraper.close()
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Scrape, clean and write the dashboard dataset in one streaming pass")
+    parser.add_argument("keywords", nargs="*", help="search keywords (default: the two engineering keywords)")
+    parser.add_argument("--keywords-file", help="file with one search keyword per line")
+    parser.add_argument("--all-programs", action="store_true",
+                        help="keep every search result instead of engineering programs only")
+    parser.add_argument("--from-excel", help="clean the Processing_Data sheet of a scraper workbook instead of crawling")
+    parser.add_argument("--from-jsonl", help="clean a JSON Lines stream of async_crawler.py instead of crawling")
+    parser.add_argument("--fetch-concurrency", type=int, default=4)
+    parser.add_argument("--rate-limit", type=float, default=1.0,
+                        help="maximum page loads per second across all workers (0 = unlimited)")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--cache-dir", default=".page_cache", help="directory of the on-disk page cache")
+    parser.add_argument("--no-cache", action="store_true", help="always download every course page")
+    parser.add_argument("--batch-size", type=int, default=64, help="rows cleaned and written per Parquet row group")
+    parser.add_argument("--output", default="final_data.parquet", help="Parquet file the dashboard reads")
+    parser.add_argument("--stream", help="also write the raw rows to this JSON Lines file")
+    parser.add_argument("--excel", help="also write the cleaned rows to this Excel file "
+                                        f"(not {EXCEL_FILE}, the dashboard rebuilds its snapshot from that one)")
+    args = parser.parse_args(argv)
+    if args.excel and os.path.abspath(args.excel) == os.path.abspath(EXCEL_FILE):
+        parser.error(f"--excel must not be {EXCEL_FILE}: the dashboard would rebuild {args.output} from it")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    if args.from_excel or args.from_jsonl:
+        convert(args)
+    else:
+        crawl(args)
+    print(f"Pipeline finished in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import argparse
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+from pages import HtmlPage
+from crawl_state import CrawlState
+from information import TCASEngineeringScraper
+
+# Fields compared against the golden file, as (row, column)
+GOLDEN_FIELDS = [
+    ('processing', 'หลักสูตร'),
+    ('processing', 'มหาวิทยาลัย'),
+    ('processing', 'ประเภทหลักสูตร'),
+    ('processing', 'ค่าใช้จ่าย'),
+    ('main', 'มหาวิทยาลัย'),
+    ('main', 'หลักสูตร'),
+    ('main', 'ค่าเทอม_บาท')
+]
+
+
+class PageCorpus:
+    """Saved course pages (raw HTML and rendered text) plus the search results that led to them"""
+    def __init__(self, directory="replay_corpus"):
+        self.directory = directory
+        self.pages_dir = os.path.join(directory, "pages")
+        self.index_file = os.path.join(directory, "index.json")
+        os.makedirs(self.pages_dir, exist_ok=True)
+        try:
+            with open(self.index_file, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        self.search_results = index.get('search_results', [])
+        self.pages = index.get('pages', {})
+    
+    def add(self, page):
+        """Save one page under a name derived from its URL"""
+        name = hashlib.sha1(page.url.encode('utf-8')).hexdigest() + ".json.gz"
+        with gzip.open(os.path.join(self.pages_dir, name), 'wt', encoding='utf-8') as f:
+            json.dump({'url': page.url, 'html': page.html, 'text': page.text}, f, ensure_ascii=False)
+        self.pages[page.url] = name
+    
+    def page(self, url):
+        """The saved page for a URL, or None"""
+        name = self.pages.get(url)
+        if name is None:
+            return None
+        with gzip.open(os.path.join(self.pages_dir, name), 'rt', encoding='utf-8') as f:
+            content = json.load(f)
+        return HtmlPage(content['url'], content['html'], text=content['text'])
+    
+    def save(self):
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump({'search_results': self.search_results, 'pages': self.pages}, f, ensure_ascii=False, indent=1)
+
+
+class ReplayFetcher:
+    """Serves course pages from a PageCorpus in place of the network"""
+    def __init__(self, corpus, timer=None):
+        self.corpus = corpus
+        self.timer = timer
+        self.stats = {'replayed': 0, 'missing': 0}
+    
+    def fetch(self, url):
+        lap = self.timer.laps() if self.timer else None
+        page = self.corpus.page(url)
+        if page is None:
+            self.stats['missing'] += 1
+            return None
+        self.stats['replayed'] += 1
+        
+        if lap:
+            lap('(load page)')
+            # The regex fields share one scan of the text, time it on its own instead of in the first field
+            page.fields
+            lap('(regex scan)')
+        return page
+    
+    def print_stats(self):
+        print(f"Replay: {self.stats['replayed']} pages from {self.corpus.directory}, {self.stats['missing']} missing")
+    
+    def close(self):
+        pass
+
+
+class FieldTimer:
+    """Collects per-field extraction times"""
+    def __init__(self):
+        self.times = {}
+    
+    def laps(self):
+        """Callable that records the time since its previous call under a field name"""
+        last = time.perf_counter()
+        
+        def lap(field):
+            nonlocal last
+            now = time.perf_counter()
+            self.times.setdefault(field, []).append(now - last)
+            last = now
+        return lap
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def normalize(value):
+    """Make values read back from Excel/JSON comparable with freshly extracted ones"""
+    # pandas reads the scraper's "N/A" back as NaN
+    if value is None or (isinstance(value, float) and pd.isna(value)) or value in ("", "N/A"):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def load_golden(filename):
+    """Expected rows per URL from a state file/golden JSON or from a two-sheet workbook"""
+    if filename.endswith('.xlsx'):
+        return CrawlState.from_excel(filename)
+    return CrawlState.load(filename)
+
+
+def field_accuracy(state, golden):
+    """Share of golden pages where each field was extracted exactly as expected"""
+    urls = [url for url in golden.entries if url in state.entries]
+    accuracy = {}
+    for row, column in GOLDEN_FIELDS:
+        correct = 0
+        for url in urls:
+            expected = (golden.entries[url].get(row) or {}).get(column)
+            actual = (state.entries[url].get(row) or {}).get(column)
+            correct += normalize(expected) == normalize(actual)
+        accuracy[f"{row}.{column}"] = correct / len(urls) if urls else None
+    return len(urls), accuracy
+
+
+def record(args):
+    """Fetch every program page live once and save it to the corpus"""
+    corpus = PageCorpus(args.corpus)
+    scraper = TCASEngineeringScraper(rate_limit=args.rate_limit, backend=args.backend, cache_dir=None)
+    try:
+        if args.from_excel:
+            sheet = pd.read_excel(args.from_excel, sheet_name='Processing_Data')
+            search_results = [{'title': row['ข้อมูลเริ่มต้น'], 'url': row['URL'], 'keyword': row['คำค้นหา']}
+                              for row in sheet.to_dict('records')]
+        else:
+            if not scraper.driver:
+                print("Failed to initialize driver. Please check ChromeDriver installation.")
+                return
+            search_results = scraper.search_engineering_programs(args.keywords)
+        corpus.search_results = search_results
+        
+        for i, result in enumerate(search_results, 1):
+            print(f"[{i}/{len(search_results)}] Recording: {result['url']}")
+            try:
+                corpus.add(scraper.fetch_snapshot(result['url']))
+            except Exception as e:
+                print(f"Error recording page: {e}")
+        corpus.save()
+        print(f"Recorded {len(corpus.pages)} pages to {corpus.directory}")
+    finally:
+        scraper.close()
+
+
+def replay(args):
+    """Run the full extraction over the corpus with no network and report speed and accuracy"""
+    corpus = PageCorpus(args.corpus)
+    search_results = corpus.search_results
+    if not search_results:
+        print(f"No recorded search results in {corpus.directory}, run the record command first")
+        return
+    
+    timer = FieldTimer()
+    fetcher = ReplayFetcher(corpus, timer)
+    elapsed = 0
+    for _ in range(args.repeat):
+        scraper = TCASEngineeringScraper(rate_limit=0, cache_dir=None, fetcher=fetcher, start_browser=False)
+        scraper.field_timer = timer
+        start = time.perf_counter()
+        # The scraper's progress output would dominate the timings
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            for i, result in enumerate(search_results, 1):
+                scraper.add_result(*scraper.process_program(i, result, len(search_results)))
+        elapsed += time.perf_counter() - start
+    
+    pages = len(search_results) * args.repeat
+    print(f"=== Replay of {len(search_results)} pages x {args.repeat} ===")
+    fetcher.print_stats()
+    print(f"Throughput: {pages / elapsed:,.1f} pages/sec ({elapsed / pages * 1000:.2f} ms/page)")
+    print(f"{'field':<24}{'p50 ms':>10}{'p99 ms':>10}")
+    for field, times in timer.times.items():
+        print(f"{field:<24}{percentile(times, 0.5) * 1000:>10.3f}{percentile(times, 0.99) * 1000:>10.3f}")
+    
+    if args.golden:
+        compared, accuracy = field_accuracy(scraper.state, load_golden(args.golden))
+        print(f"\nAccuracy against {args.golden} ({compared} pages):")
+        for field, share in accuracy.items():
+            print(f"{field:<34}{'n/a' if share is None else f'{share:.1%}':>8}")
+    
+    if args.save_golden:
+        scraper.state.save(args.save_golden)
+        print(f"Saved current results as golden file {args.save_golden}")
+    if args.output:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            scraper.save_to_excel(args.output)
+        print(f"Wrote {args.output}")
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Record course pages once and replay the extraction offline")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    record_parser = commands.add_parser("record", help="save the raw HTML and text of every program page")
+    record_parser.add_argument("keywords", nargs="*", default=["วิศวกรรมคอมพิวเตอร์", "วิศวกรรมปัญญาประดิษฐ์"],
+                               help="search keywords (default: the two engineering keywords)")
+    record_parser.add_argument("--from-excel", help="record the URLs of a previous workbook instead of searching")
+    record_parser.add_argument("--corpus", default="replay_corpus", help="directory the pages are saved to")
+    record_parser.add_argument("--backend", choices=["selenium", "http"], default="selenium")
+    record_parser.add_argument("--rate-limit", type=float, default=1.0,
+                               help="maximum page loads per second (0 = unlimited)")
+    
+    replay_parser = commands.add_parser("replay", help="run the extraction over a saved corpus and benchmark it")
+    replay_parser.add_argument("--corpus", default="replay_corpus", help="directory of the saved pages")
+    replay_parser.add_argument("--repeat", type=int, default=1, help="times the whole corpus is extracted")
+    replay_parser.add_argument("--golden", help="expected rows (golden/state JSON or a two-sheet workbook)")
+    replay_parser.add_argument("--save-golden", help="write the extracted rows as a new golden file")
+    replay_parser.add_argument("--output", help="also write the usual two-sheet workbook")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "record":
+        record(args)
+    else:
+        replay(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import math
+import pandas as pd
+
+# Operators of the DataTable filter row, two-character ones before their one-character prefixes
+FILTER_OPERATORS = [['ge', '>='], ['le', '<='], ['lt', '<'], ['gt', '>'], ['ne', '!='], ['eq', '='],
+                    ['contains'], ['datestartswith']]
+# Case prefixes of the operators, e.g. "icontains" or "i=", a case-insensitive toggle in the filter cell.
+# Operators without one are case-sensitive, as the table's default filter_options
+CASE_PREFIXES = {'i': True, 's': False}
+FEE_COLUMN = 'ค่าเทอมต่อเทอม_ประมาณ'
+# Shown in the fee column of programs without a fee
+MISSING_FEE = '❌ ไม่ระบุ'
+
+
+def table_columns(df):
+    """Table columns, university name first"""
+    return ['ชื่อมหาวิทยาลัย'] + [col for col in df.columns if col != 'ชื่อมหาวิทยาลัย']
+
+
+def split_operator(rest):
+    """Operator type and operator at the start of rest, the text from the operator on and whether it ignores case"""
+    candidates = [(rest, False)]
+    if rest[:1] in CASE_PREFIXES:
+        candidates.append((rest[1:], CASE_PREFIXES[rest[:1]]))
+    for text, ignore_case in candidates:
+        for operator_type in FILTER_OPERATORS:
+            for operator in operator_type:
+                if text.startswith(operator):
+                    return operator_type, operator, text, ignore_case
+    return None, None, None, False
+
+
+def split_filter_part(filter_part):
+    """Column, operator, value and case-insensitivity of one clause of a filter_query,
+    e.g. {หลักสูตร} icontains "คอม" """
+    name_part, _, rest = filter_part.strip().partition('}')
+    name = name_part[name_part.find('{') + 1:]
+    operator_type, operator, rest, ignore_case = split_operator(rest.strip())
+    if operator_type is None:
+        return None, None, None, False
+    
+    value_part = rest[len(operator):].strip()
+    quote = value_part[:1]
+    if quote in ("'", '"', '`') and len(value_part) > 1 and value_part[-1] == quote:
+        value = value_part[1:-1].replace('\\' + quote, quote)
+    elif operator_type[0] in ('contains', 'datestartswith'):
+        value = value_part
+    else:
+        try:
+            value = float(value_part)
+        except ValueError:
+            value = value_part
+    # The word form of the operator, e.g. "ge" for both "ge" and ">="
+    return name, operator_type[0], value, ignore_case
+
+
+def filter_mask(values, operator, value, ignore_case=False):
+    """Rows of a column matching one filter clause"""
+    if operator in ('contains', 'datestartswith') or not isinstance(value, float):
+        # Text comparison, empty cells are empty text
+        values, value = values.astype(object).where(values.notna(), "").astype(str), str(value)
+        if ignore_case:
+            values, value = values.str.lower(), value.lower()
+    if operator == 'contains':
+        return values.str.contains(value, regex=False)
+    if operator == 'datestartswith':
+        return values.str.startswith(value)
+    if isinstance(value, float) and not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values, errors='coerce')
+    compare = {'ge': values.__ge__, 'le': values.__le__, 'lt': values.__lt__,
+               'gt': values.__gt__, 'ne': values.__ne__, 'eq': values.__eq__}[operator]
+    return compare(value)
+
+
+def query_rows(df, rows, filter_query, sort_by):
+    """Positions of the filtered rows left by the table's filter row, in the order of its sort.
+    Only the columns filtered or sorted on are read"""
+    clauses = [split_filter_part(part) for part in filter_query.split(' && ')] if filter_query else []
+    clauses = [clause for clause in clauses if clause[0] in df.columns]
+    sort_by = [column for column in sort_by or [] if column['column_id'] in df.columns]
+    columns = list(dict.fromkeys([name for name, _, _, _ in clauses] + [column['column_id'] for column in sort_by]))
+    if not columns:
+        return rows
+    
+    frame = df[columns].iloc[rows].reset_index(drop=True)
+    mask = pd.Series(True, index=frame.index)
+    for name, operator, value, ignore_case in clauses:
+        values = frame[name]
+        if name == FEE_COLUMN and not isinstance(value, float):
+            # Text filters see the fee column as it is shown
+            values = values.astype(object).where(values.notna(), MISSING_FEE)
+        mask &= filter_mask(values, operator, value, ignore_case)
+    frame = frame[mask]
+    if sort_by:
+        frame = frame.sort_values([column['column_id'] for column in sort_by],
+                                  ascending=[column['direction'] == 'asc' for column in sort_by],
+                                  kind='stable', na_position='last')
+    return rows[frame.index.to_numpy()]
+
+
+def page_count(rows, page_size):
+    return max(1, math.ceil(len(rows) / page_size))
+
+
+def page_records(df, rows, page, page_size):
+    """Table records of one page of rows"""
+    table_data = df.iloc[rows[page * page_size:(page + 1) * page_size]].copy()
+    # Format table data to show NaN values nicely
+    table_data[FEE_COLUMN] = table_data[FEE_COLUMN].fillna(MISSING_FEE)
+    return table_data[table_columns(df)].to_dict('records')
@@ -0,0 +1,109 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import AggregateCube, aggregate
+from indexes import CategoryIndex, TuitionIndex
+
+TYPES = ['ภาษาไทย ปกติ', 'นานาชาติ', 'Joint Degree - นานาชาติ', 'ภาษาไทย พิเศษ']
+UNIVERSITIES = [f'มหาวิทยาลัย {i}' for i in range(12)]
+
+
+def random_dataset(seed, rows=400):
+    rng = np.random.default_rng(seed)
+    fees = rng.choice([15000, 21000, 25500, 30000, 45000, 60000, 125000], rows).astype(float)
+    fees[rng.random(rows) < 0.2] = np.nan
+    types = pd.Series(rng.choice(TYPES, rows), dtype=object)
+    types[rng.random(rows) < 0.05] = None
+    universities = pd.Series(rng.choice(UNIVERSITIES, rows), dtype=object)
+    type_index = CategoryIndex(types)
+    uni_index = CategoryIndex(universities)
+    tuition_index = TuitionIndex(pd.Series(fees))
+    return SimpleNamespace(type_index=type_index, uni_index=uni_index, tuition_index=tuition_index,
+                           cube=AggregateCube(type_index, uni_index, tuition_index), types=types,
+                           universities=universities)
+
+
+def filtered_rows(dataset, selected_type, selected_uni, data_filter, tuition_range):
+    """Rows of the filters in table order: in the fee range first, then the rows without a fee"""
+    fees = dataset.tuition_index.fees
+    mask = np.ones(len(fees), dtype=bool)
+    if selected_type:
+        mask &= dataset.types.isin(selected_type).to_numpy()
+    if selected_uni:
+        mask &= dataset.universities.isin(selected_uni).to_numpy()
+    if data_filter == 'with_tuition':
+        mask &= ~np.isnan(fees)
+    elif data_filter == 'without_tuition':
+        mask &= np.isnan(fees)
+    if not tuition_range:
+        return np.flatnonzero(mask)
+    in_range = mask & (fees >= tuition_range[0]) & (fees <= tuition_range[1])
+    return np.concatenate([np.flatnonzero(in_range), np.flatnonzero(mask & np.isnan(fees))])
+
+
+def assert_same_summary(cube, rows):
+    assert cube.keys() == rows.keys()
+    for key, expected in rows.items():
+        value = cube[key]
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(value.reset_index(drop=True), expected.reset_index(drop=True),
+                                          check_dtype=False)
+        elif isinstance(expected, pd.Series):
+            pd.testing.assert_series_equal(value, expected, check_dtype=False)
+        elif isinstance(expected, np.ndarray):
+            np.testing.assert_allclose(np.sort(value), np.sort(expected))
+        elif expected is None:
+            assert value is None, key
+        else:
+            assert value == pytest.approx(expected, nan_ok=True), key
+
+
+def random_filters(rng):
+    selected_type = list(rng.choice(TYPES, rng.integers(1, 3), replace=False)) if rng.random() < 0.5 else None
+    selected_uni = list(rng.choice(UNIVERSITIES, rng.integers(1, 4), replace=False)) if rng.random() < 0.5 else None
+    data_filter = rng.choice(['all', 'with_tuition', 'without_tuition'])
+    tuition_range = None
+    if rng.random() < 0.6:
+        low, high = sorted(rng.choice([0, 15000, 20000, 25500, 40000, 60000, 200000], 2))
+        tuition_range = [int(low), int(high)]
+    return selected_type, selected_uni, data_filter, tuition_range
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_rollup_matches_row_aggregate(seed):
+    dataset = random_dataset(seed)
+    rng = np.random.default_rng(seed + 100)
+    for _ in range(60):
+        filters = random_filters(rng)
+        rows = filtered_rows(dataset, *filters)
+        assert_same_summary(dataset.cube.rollup(*filters), aggregate(dataset, rows))
+
+
+@pytest.mark.parametrize('filters', [
+    (['ไม่มีประเภทนี้'], None, 'all', None),
+    (None, None, 'with_tuition', [1, 2]),
+    (None, ['มหาวิทยาลัย 1'], 'without_tuition', [0, 0]),
+    (None, None, 'all', None),
+])
+def test_rollup_edge_filters(filters):
+    dataset = random_dataset(7)
+    rows = filtered_rows(dataset, *filters)
+    summary = dataset.cube.rollup(*filters)
+    assert summary['total_courses'] == len(rows)
+    assert_same_summary(summary, aggregate(dataset, rows))
+
+
+def test_rollup_of_nothing():
+    dataset = random_dataset(3)
+    summary = dataset.cube.rollup(['ไม่มีประเภทนี้'], None, 'all', None)
+    assert summary['total_courses'] == 0
+    assert summary['with_tuition'] == 0
+    assert summary['tuition_avg'] is None and summary['uni_avg'] is None
+    assert summary['courses_per_uni'].empty
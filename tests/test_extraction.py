@@ -0,0 +1,87 @@
+import os
+import re
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import extract_fields
+
+# The per-field patterns the scraper ran one re.findall() at a time, in priority order
+OLD_PATTERNS = {
+    'university': [r'([^.\n]*(?:มหาวิทยาลัย|สถาบัน)[^.\n]*)'],
+    'course_type': [
+        r'ประเภทหลักสูตร[:\s]*([^\n]+)',
+        r'ประเภท[:\s]*([^\n]+)',
+        r'(ภาษาไทย|ภาษาอังกฤษ|นานาชาติ|ปกติ|พิเศษ|บางเวลา|เต็มเวลา)',
+        r'(ปกติ|พิเศษ|นานาชาติ|International|Regular|Special)'
+    ],
+    'cost': [
+        r'ค่าใช้จ่าย[:\s]*([^\n]+)',
+        r'อัตราค่าเรียน[:\s]*([^\n]+)',
+        r'อัตราค่าลำเรียน[:\s]*([^\n]+)',
+        r'ค่าเทอม[:\s]*([^\n]+)',
+        r'ค่าธรรมเนียม[:\s]*([^\n]+)',
+        r'(\d+(?:,\d+)*\s*(?:บาท|บ\.)[^\n]*(?:เทอม|ภาค|ปี|หลักสูตร))',
+        r'(อัตราค่า[^\n]*\d+(?:,\d+)*[^\n]*บาท)',
+        r'(ค่าลำเรียน[^\n]*\d+(?:,\d+)*[^\n]*บาท)'
+    ],
+    'tuition_fee': [
+        r'ค่าเทอม[:\s]*(\d+(?:,\d+)*)\s*บาท',
+        r'ค่าใช้จ่าย[:\s]*(\d+(?:,\d+)*)\s*บาท',
+        r'อัตราค่าเทอม[:\s]*(\d+(?:,\d+)*)\s*บาท',
+        r'(\d+(?:,\d+)*)\s*บาท[/\s]*เทอม',
+        r'(\d+(?:,\d+)*)\s*บาท[/\s]*ปี'
+    ]
+}
+
+PAGE_TEXTS = [
+    "",
+    "หลักสูตรวิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมคอมพิวเตอร์\n"
+    "ข้อมูลการรับสมัครของจุฬาลงกรณ์มหาวิทยาลัย\n"
+    "ประเภทหลักสูตร: ภาษาไทย ปกติ\n"
+    "ค่าใช้จ่าย: ภาคการศึกษาละ 25,500 บาท\n",
+    "สถาบันเทคโนโลยีพระจอมเกล้าเจ้าคุณทหารลาดกระบัง. คณะวิศวกรรมศาสตร์\n"
+    "ประเภท นานาชาติ\n"
+    "อัตราค่าเทอม 90,000 บาท\n"
+    "อัตราค่าเรียน: 90,000 บาท/เทอม ตลอดหลักสูตร 720,000 บาท\n",
+    "Faculty of Engineering, International Program (REGULAR track, special cases)\n"
+    "มหาวิทยาลัยมหิดล.วิทยาเขตศาลายา\n"
+    "ค่าธรรมเนียม 1,234,567 บ. ต่อปี\n"
+    "125000 บาท / ปี\n"
+    "ค่าลำเรียน ภาคละ 30,000 บาท\n"
+    "อัตราค่าลำเรียน: เหมาจ่าย 21,000 บาท\n",
+    "ค่าเทอม:25000บาท ค่าเทอม 30,000 บาท/เทอม\n"
+    "ค่าใช้จ่ายค่าใช้จ่าย 5,000 บาท\n"
+    "หลักสูตรภาษาอังกฤษ เต็มเวลา บางเวลา พิเศษ\n"
+    "ราคา 15,000บาทเทอม และ 45,000 บาท ปี\n",
+    "ไม่มีข้อมูลค่าใช้จ่ายในหน้านี้\nประเภท\nมหาวิทยาลัย",
+]
+
+# Words and amounts the random pages are built from, around every anchor of the patterns
+VOCABULARY = ['มหาวิทยาลัย', 'สถาบัน', 'ประเภทหลักสูตร', 'ประเภท', 'ภาษาไทย', 'นานาชาติ', 'ปกติ', 'พิเศษ',
+              'International', 'regular', 'SPECIAL', 'ค่าใช้จ่าย', 'อัตราค่าเรียน', 'อัตราค่าลำเรียน', 'อัตราค่าเทอม',
+              'ค่าเทอม', 'ค่าธรรมเนียม', 'ค่าลำเรียน', 'บาท', 'บ.', 'เทอม', 'ภาค', 'ปี', 'หลักสูตร', '25,500',
+              '1,000,000', '90000', '7', ':', ' ', ' ', '\n', '.', '/', 'วิศวกรรม', 'abc']
+
+
+def old_fields(text):
+    """Matches of every pattern run on its own, as the parsers used to"""
+    return {
+        field: [re.findall(pattern, text, 0 if field == 'university' else re.IGNORECASE) for pattern in patterns]
+        for field, patterns in OLD_PATTERNS.items()
+    }
+
+
+@pytest.mark.parametrize('text', PAGE_TEXTS)
+def test_engine_matches_per_pattern_findall(text):
+    assert extract_fields(text) == old_fields(text)
+
+
+def test_engine_matches_findall_on_random_pages():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        text = ''.join(rng.choice(VOCABULARY, rng.integers(0, 60)))
+        assert extract_fields(text) == old_fields(text), text
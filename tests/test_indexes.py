@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indexes import TextIndex
+
+
+def courses():
+    return pd.DataFrame({
+        'หลักสูตร': ['วิศวกรรมคอมพิวเตอร์', 'วิศวกรรมไฟฟ้า', 'Computer Engineering'],
+        'ประเภทหลักสูตร': pd.Categorical(['ภาษาไทย ปกติ', 'ภาษาไทย ปกติ', 'นานาชาติ']),
+        'ค่าเทอมต่อเทอม_ประมาณ': [25500.0, np.nan, 125000.0],
+    })
+
+
+def test_search_text_ignores_case():
+    index = TextIndex(courses())
+    assert index.search('computer').tolist() == [2]
+    assert index.search('วิศวกรรม ไฟฟ้า').tolist() == [1]
+
+
+def test_search_fee():
+    index = TextIndex(courses())
+    assert index.search('25500').tolist() == [0]
+    assert index.search('125000.0').tolist() == [2]
+    assert index.search('5000').tolist() == [2]
+
+
+def test_missing_values_are_not_searched():
+    index = TextIndex(courses())
+    assert index.search('nan').tolist() == []
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_query import FEE_COLUMN, query_rows, split_filter_part
+
+
+def courses():
+    return pd.DataFrame({
+        'หลักสูตร': ['Computer Engineering', 'computer science', 'Electrical Engineering'],
+        FEE_COLUMN: [25500.0, np.nan, 125000.0],
+    })
+
+
+def filtered(filter_query, sort_by=None):
+    df = courses()
+    return query_rows(df, np.arange(len(df)), filter_query, sort_by).tolist()
+
+
+def test_split_filter_part():
+    assert split_filter_part('{หลักสูตร} contains "คอม"') == ('หลักสูตร', 'contains', 'คอม', False)
+    assert split_filter_part('{หลักสูตร} icontains "คอม"') == ('หลักสูตร', 'contains', 'คอม', True)
+    assert split_filter_part('{หลักสูตร} scontains "คอม"') == ('หลักสูตร', 'contains', 'คอม', False)
+    assert split_filter_part(f'{{{FEE_COLUMN}}} i>= 30000') == (FEE_COLUMN, 'ge', 30000.0, True)
+    assert split_filter_part('{หลักสูตร} seq "A"') == ('หลักสูตร', 'eq', 'A', False)
+    assert split_filter_part('{หลักสูตร} is blank') == (None, None, None, False)
+
+
+def test_case_sensitive_operators():
+    assert filtered('{หลักสูตร} contains "Computer"') == [0]
+    assert filtered('{หลักสูตร} scontains "Computer"') == [0]
+    assert filtered('{หลักสูตร} seq "computer science"') == [1]
+
+
+def test_case_insensitive_operators():
+    assert filtered('{หลักสูตร} icontains "computer"') == [0, 1]
+    assert filtered('{หลักสูตร} ieq "COMPUTER SCIENCE"') == [1]
+    assert filtered('{หลักสูตร} i= "electrical engineering"') == [2]
+    assert filtered('{หลักสูตร} idatestartswith "COMP"') == [0, 1]
+    assert filtered('{หลักสูตร} ine "computer engineering"') == [1, 2]
+
+
+def test_fee_filters():
+    assert filtered(f'{{{FEE_COLUMN}}} >= 30000') == [2]
+    assert filtered(f'{{{FEE_COLUMN}}} i< 30000') == [0]
+    assert filtered(f'{{{FEE_COLUMN}}} icontains "ไม่ระบุ"') == [1]
+    assert filtered(f'{{{FEE_COLUMN}}} >= 0 && {{หลักสูตร}} icontains "engineering"',
+                    [{'column_id': FEE_COLUMN, 'direction': 'desc'}]) == [2, 0]
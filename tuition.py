@@ -0,0 +1,82 @@
+import argparse
+import re
+import numpy as np
+import pandas as pd
+
+# Semesters a fee covers, by how it is quoted: per term, per year, or once for the whole 4-year program
+SEMESTERS_PER = {'per_term': 1, 'per_year': 2, 'lumpsum': 8}
+# A bare amount at least this large is taken as the fee for the whole program
+LUMPSUM_THRESHOLD = 100000
+# Per-semester fees above this are left out of Main_Data
+MAX_SEMESTER_FEE = 200000
+
+# Rules of the cleaning step, tried in order on the ค่าใช้จ่าย text
+# Case 1: ภาคการศึกษาละ ...
+PER_TERM_PATTERN = re.compile(r'ภาคการศึกษาละ\s*([\d,]+)')
+# Case 2: xxx/ภาค หรือ ต่อภาคการศึกษา
+PER_TERM_SUFFIX_PATTERN = re.compile(r'([,\d]+)[^\d]{0,5}(?:บาท)?\s*(?:/|ต่อ)?\s*ภาค')
+# Case 3: ตัวเลขล้วน น่าจะเป็นแบบรวม
+AMOUNT_PATTERN = re.compile(r'([\d,]+)')
+
+
+def to_amount(text):
+    """"25,500" -> 25500"""
+    return int(text.replace(',', ''))
+
+
+def per_semester(amount, fee_type):
+    """Per-semester amount of a fee quoted per term, per year or as a lumpsum"""
+    return amount / SEMESTERS_PER[fee_type]
+
+
+def extract_amounts(texts, pattern):
+    """First match of the pattern in every text, as a number (NaN where there is none)"""
+    digits = texts.str.extract(pattern, expand=False).str.replace(',', '', regex=False)
+    return pd.to_numeric(digits, errors='coerce')
+
+
+def normalize_tuition(costs):
+    """Amount, fee type and estimated per-semester fee for a column of ค่าใช้จ่าย texts"""
+    # Programs of one university repeat the same text, run the patterns once per distinct text.
+    # Numbers become text like the notebook's str(), a missing value matches no rule
+    codes, uniques = pd.factorize(costs.astype(str), use_na_sentinel=False)
+    texts = pd.Series(uniques, dtype=object)
+    per_term = extract_amounts(texts, PER_TERM_PATTERN).fillna(extract_amounts(texts, PER_TERM_SUFFIX_PATTERN))
+    amount = extract_amounts(texts, AMOUNT_PATTERN)
+    lumpsum = amount.where(per_term.isna() & (amount >= LUMPSUM_THRESHOLD))
+    
+    fee_type = np.full(len(texts), np.nan, dtype=object)
+    fee_type[per_term.notna().to_numpy()] = 'per_term'
+    fee_type[lumpsum.notna().to_numpy()] = 'lumpsum'
+    amount = per_term.fillna(lumpsum).to_numpy()
+    semester_fee = np.where(fee_type == 'lumpsum', amount / SEMESTERS_PER['lumpsum'], amount)
+    
+    # Spread the per-text results back over the rows
+    return pd.DataFrame({
+        'ค่าใช้จ่าย_ตัวเลข': amount[codes],
+        'ประเภทค่าใช้จ่าย': fee_type[codes],
+        'ค่าเทอมต่อเทอม_ประมาณ': semester_fee[codes]
+    }, index=costs.index)
+
+
+def clean_processing_data(df):
+    """Processing_Data rows with the tuition columns added"""
+    return df.join(normalize_tuition(df['ค่าใช้จ่าย']))
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Normalize the ค่าใช้จ่าย text of scraped programs to a per-semester fee")
+    parser.add_argument("--input", default="tcas_engineering_programs.xlsx", help="workbook written by the scraper")
+    parser.add_argument("--output", default="cleaned_tuition_data_v2.xlsx", help="cleaned workbook to write")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    df = clean_processing_data(pd.read_excel(args.input, sheet_name="Processing_Data"))
+    df.to_excel(args.output, index=False)
+    print(f"Saved {len(df)} rows to {args.output}")
+
+if __name__ == "__main__":
+    main()